@@ -0,0 +1,200 @@
+import hashlib
+import time
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import router
+from django.utils.translation import gettext_lazy as _
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.permissions import SAFE_METHODS
+
+from core.cache import LocalLRUCache
+from core.constants import (
+    AUTH_TOKEN_CACHE_SIZE,
+    AUTH_TOKEN_CACHE_TIMEOUT,
+    AUTH_TOKEN_LOCAL_TTL,
+)
+
+User = get_user_model()
+
+TOKEN_CACHE_KEY_PREFIX = "auth-token:"
+USER_TOKEN_CACHE_KEY_PREFIX = "auth-user-token:"
+USER_VERSION_CACHE_KEY_PREFIX = "auth-user-version:"
+CACHED_USER_FIELDS = (
+    "id",
+    "email",
+    "username",
+    "first_name",
+    "last_name",
+    "avatar",
+    "is_active",
+    "is_staff",
+    "is_superuser",
+    "updated_at",
+)
+SNAPSHOT_FIELDS = tuple(
+    field.attname
+    for field in User._meta.concrete_fields
+    if field.attname in CACHED_USER_FIELDS
+)
+
+
+class TokenSnapshotCache:
+
+    def __init__(
+        self,
+        max_size: int = AUTH_TOKEN_CACHE_SIZE,
+        local_ttl: float = AUTH_TOKEN_LOCAL_TTL,
+        timeout: int = AUTH_TOKEN_CACHE_TIMEOUT,
+    ) -> None:
+        self.timeout = timeout
+        self._local = LocalLRUCache(max_size, local_ttl)
+
+    def get(self, key: str) -> Optional[tuple]:
+        # Снимок хранится вместе с версией пользователя: её смена при
+        # правке профиля, деактивации или выходе в любом процессе делает
+        # устаревшими локальные копии во всех остальных.
+        digest = self._digest(key)
+        entry = self._local.get(digest, None)
+        if entry is None or not self._is_current(entry):
+            entry = cache.get(self._token_cache_key(digest))
+            if entry is None or not self._is_current(entry):
+                snapshot = self._load(key)
+                if snapshot is None:
+                    return None
+                user_id = snapshot[0][0]
+                entry = (snapshot, self._get_version(user_id))
+                cache.set_many(
+                    {
+                        self._token_cache_key(digest): entry,
+                        self._user_cache_key(user_id): digest,
+                    },
+                    self.timeout,
+                )
+            self._local.set(digest, entry)
+        return entry[0]
+
+    def invalidate(self, key: str, user_id: Optional[int] = None) -> None:
+        digest = self._digest(key)
+        cache.delete(self._token_cache_key(digest))
+        self._local.delete(digest)
+        if user_id is not None:
+            self._bump_versions((user_id,))
+
+    def invalidate_user(self, user_id: int) -> None:
+        self.invalidate_users((user_id,))
+
+    def invalidate_users(self, user_ids: Iterable[int]) -> None:
+        user_ids = list(user_ids)
+        self._bump_versions(user_ids)
+        digests = cache.get_many(
+            [self._user_cache_key(user_id) for user_id in user_ids]
+        )
+        if digests:
+            cache.delete_many(
+                [
+                    *digests,
+                    *map(self._token_cache_key, digests.values()),
+                ]
+            )
+            self._local.delete(*digests.values())
+
+    def clear_local(self) -> None:
+        self._local.clear()
+
+    def _is_current(self, entry: tuple) -> bool:
+        snapshot, version = entry
+        return self._get_version(snapshot[0][0]) == version
+
+    def _get_version(self, user_id: int) -> int:
+        return cache.get_or_set(
+            self._user_version_key(user_id),
+            time.time_ns,
+            timeout=None,
+        )
+
+    def _bump_versions(self, user_ids: Iterable[int]) -> None:
+        version = time.time_ns()
+        cache.set_many(
+            {self._user_version_key(user_id): version for user_id in user_ids},
+            timeout=None,
+        )
+
+    @staticmethod
+    def _load(key: str) -> Optional[tuple]:
+        row = (
+            Token.objects.filter(key=key)
+            .values_list(
+                *(f"user__{field}" for field in SNAPSHOT_FIELDS),
+                "created",
+            )
+            .first()
+        )
+        if row is None:
+            return None
+        return row[:-1], row[-1]
+
+    @staticmethod
+    def _digest(key: str) -> str:
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    @staticmethod
+    def _token_cache_key(digest: str) -> str:
+        return f"{TOKEN_CACHE_KEY_PREFIX}{digest}"
+
+    @staticmethod
+    def _user_cache_key(user_id: int) -> str:
+        return f"{USER_TOKEN_CACHE_KEY_PREFIX}{user_id}"
+
+    @staticmethod
+    def _user_version_key(user_id: int) -> str:
+        return f"{USER_VERSION_CACHE_KEY_PREFIX}{user_id}"
+
+
+token_snapshot_cache = TokenSnapshotCache(
+    max_size=getattr(
+        settings, "AUTH_TOKEN_CACHE_SIZE", AUTH_TOKEN_CACHE_SIZE
+    ),
+    local_ttl=getattr(settings, "AUTH_TOKEN_LOCAL_TTL", AUTH_TOKEN_LOCAL_TTL),
+    timeout=getattr(
+        settings, "AUTH_TOKEN_CACHE_TIMEOUT", AUTH_TOKEN_CACHE_TIMEOUT
+    ),
+)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    """Токен-аутентификация со снимком пользователя из кэша.
+
+    Снимок годится только для чтения: для изменяющих запросов
+    пользователь загружается из базы, чтобы save() не записал обратно
+    устаревшие is_active, is_staff и прочие поля.
+    """
+
+    load_from_database = False
+
+    def authenticate(self, request):
+        self.load_from_database = request.method not in SAFE_METHODS
+        return super().authenticate(request)
+
+    def authenticate_credentials(self, key):
+        if self.load_from_database:
+            return super().authenticate_credentials(key)
+        snapshot = token_snapshot_cache.get(key)
+        if snapshot is None:
+            raise AuthenticationFailed(_("Invalid token."))
+        user_values, created = snapshot
+        database = router.db_for_read(User)
+        user = User.from_db(database, SNAPSHOT_FIELDS, user_values)
+        if not user.is_active:
+            raise AuthenticationFailed(_("User inactive or deleted."))
+        token = Token.from_db(
+            database,
+            ("key", "user_id", "created"),
+            (key, user.pk, created),
+        )
+        token.user = user
+        return user, token
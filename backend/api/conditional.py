@@ -0,0 +1,117 @@
+import hashlib
+from datetime import datetime
+from typing import Iterable, NamedTuple, Optional
+
+from django.utils.cache import (
+    get_conditional_response,
+    patch_vary_headers,
+    quote_etag,
+)
+from django.utils.http import http_date
+from rest_framework import status
+
+from api.response_cache import (
+    get_versions,
+    version_timestamp,
+    viewer_scope,
+)
+
+
+class Validators(NamedTuple):
+
+    etag: str
+    last_modified: Optional[datetime] = None
+
+
+def make_validators(
+    request,
+    state: Iterable,
+    timestamps: Iterable[Optional[datetime]] = (),
+) -> Validators:
+    parts = [
+        request.build_absolute_uri(request.path),
+        sorted(request.query_params.lists()),
+        *state,
+    ]
+    user = request.user
+    last_modified = None
+    if user.is_authenticated:
+        parts.extend((user.pk, *get_versions((viewer_scope(user.pk),))))
+    else:
+        timestamps = [value for value in timestamps if value is not None]
+        last_modified = max(timestamps, default=None)
+    digest = hashlib.md5(repr(parts).encode()).hexdigest()
+    return Validators(quote_etag(digest), last_modified)
+
+
+def make_version_validators(request, scopes: Iterable[str]) -> Validators:
+    versions = get_versions(scopes)
+    return make_validators(
+        request,
+        versions,
+        timestamps=map(version_timestamp, versions),
+    )
+
+
+def accepts_encoding(header: str, coding: str) -> bool:
+    wildcard = False
+    for item in header.split(","):
+        name, _, params = item.partition(";")
+        name = name.strip().lower()
+        if not name:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if name == coding:
+            return quality > 0
+        if name == "*":
+            wildcard = quality > 0
+    return wildcard
+
+
+class ConditionalGetMixin:
+
+    def get_conditional_validators(self) -> Optional[Validators]:
+        return None
+
+    def list(self, request, *args, **kwargs):
+        return self._conditional_response(
+            super().list, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._conditional_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def _conditional_response(self, handler, request, *args, **kwargs):
+        validators = None
+        if request.accepted_renderer.format == "json":
+            validators = self.get_conditional_validators()
+        if validators is None:
+            return handler(request, *args, **kwargs)
+        last_modified = None
+        if validators.last_modified is not None:
+            last_modified = int(validators.last_modified.timestamp())
+        response = get_conditional_response(
+            request,
+            etag=validators.etag,
+            last_modified=last_modified,
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+        if response.status_code in (
+            status.HTTP_200_OK,
+            status.HTTP_304_NOT_MODIFIED,
+        ):
+            response["ETag"] = validators.etag
+            if last_modified is not None:
+                response["Last-Modified"] = http_date(last_modified)
+            patch_vary_headers(response, ("Authorization",))
+        return response
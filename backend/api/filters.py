@@ -1,29 +1,12 @@
 from django_filters import rest_framework as filters
 from rest_framework.request import Request
 
-from recipes.models import Ingredient, Recipe
-
-
-class IngredientFilter(filters.FilterSet):
-
-    name = filters.CharFilter(method="filter_name")
-
-    class Meta:
-        model = Ingredient
-        fields = ("name",)
-
-    def filter_name(self, queryset, name, value):
-        if not value:
-            return queryset
-        normalized = value.strip()
-        if not normalized:
-            return queryset
-
-        case_sensitive_queryset = queryset.filter(name__startswith=normalized)
-        if case_sensitive_queryset.exists():
-            return case_sensitive_queryset.order_by("name")
-
-        return queryset.filter(name__istartswith=normalized).order_by("name")
+from recipes.models import (
+    Favorite,
+    Recipe,
+    ShoppingCart,
+    user_relation_exists,
+)
 
 
 class RecipeFilter(filters.FilterSet):
@@ -44,13 +27,13 @@ class RecipeFilter(filters.FilterSet):
         user = self._get_user()
         if not (value and user):
             return queryset
-        return queryset.filter(favorites__user=user)
+        return queryset.filter(user_relation_exists(Favorite, user))
 
     def filter_is_in_shopping_cart(self, queryset, name, value):
         user = self._get_user()
         if not (value and user):
             return queryset
-        return queryset.filter(shopping_carts__user=user)
+        return queryset.filter(user_relation_exists(ShoppingCart, user))
 
     def _get_user(self):
         request: Request = getattr(self, "request", None)
@@ -1,9 +1,313 @@
+import base64
+import binascii
+import hashlib
+import json
+from collections import OrderedDict
+from functools import cached_property, partial
+from typing import Callable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.paginator import EmptyPage
+from django.core.paginator import Paginator as DjangoPaginator
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
 from rest_framework.pagination import PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from api.response_cache import (
+    RECIPES_SCOPE,
+    USERS_SCOPE,
+    get_versions,
+    viewer_scope,
+)
+from core.constants import (
+    COUNT_CACHE_TIMEOUT,
+    COUNT_ESTIMATE_THRESHOLD,
+    CURSOR_QUERY_PARAM,
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    PAGE_SIZE_QUERY_PARAM,
+)
+
+
+class CountingPaginator(DjangoPaginator):
+
+    def __init__(self, object_list, per_page, count_resolver=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.count_resolver = count_resolver
+        self.count_exact = True
+
+    @cached_property
+    def count(self) -> int:
+        if self.count_resolver is None:
+            return super().count
+        count, self.count_exact = self.count_resolver(self.object_list)
+        return count
 
-from core.constants import DEFAULT_PAGE_SIZE, PAGE_SIZE_QUERY_PARAM
+    def validate_number(self, number) -> int:
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if self.count_exact or int(number) < 1:
+                raise
+            return int(number)
+
+    def page(self, number):
+        number = self.validate_number(number)
+        if self.count_exact:
+            return super().page(number)
+        # Неточное число не должно ограничивать выборку: берём лишнюю
+        # строку и уточняем count по тому, что реально нашлось.
+        rows = self._get_rows(number)
+        if not rows and number > 1:
+            self._set_count(DjangoPaginator.count.func(self))
+            self.count_exact = True
+            number = max(self.num_pages, 1)
+            rows = self._get_rows(number)
+        seen = (number - 1) * self.per_page + len(rows)
+        if len(rows) <= self.per_page or seen > self.count:
+            self._set_count(seen)
+        return self._get_page(rows[:self.per_page], number, self)
+
+    def _get_rows(self, number: int) -> list:
+        bottom = (number - 1) * self.per_page
+        return list(self.object_list[bottom:bottom + self.per_page + 1])
+
+    def _set_count(self, count: int) -> None:
+        self.__dict__["count"] = count
+        self.__dict__.pop("num_pages", None)
 
 
 class FoodgramPagination(PageNumberPagination):
 
     page_size = DEFAULT_PAGE_SIZE
     page_size_query_param = PAGE_SIZE_QUERY_PARAM
+    max_page_size = getattr(
+        settings,
+        "PAGINATION_MAX_PAGE_SIZE",
+        MAX_PAGE_SIZE,
+    )
+    cursor_query_param = CURSOR_QUERY_PARAM
+    invalid_cursor_message = "Некорректный курсор."
+    count_cache_timeout = getattr(
+        settings,
+        "PAGINATION_COUNT_CACHE_TIMEOUT",
+        COUNT_CACHE_TIMEOUT,
+    )
+    count_estimate_threshold = getattr(
+        settings,
+        "PAGINATION_COUNT_ESTIMATE_THRESHOLD",
+        COUNT_ESTIMATE_THRESHOLD,
+    )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.use_cursor = self.cursor_query_param in request.query_params
+        if not self.use_cursor:
+            self.django_paginator_class = partial(
+                CountingPaginator,
+                count_resolver=self._make_count_resolver(request, view),
+            )
+            return super().paginate_queryset(queryset, request, view)
+        return self._paginate_by_cursor(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if not self.use_cursor:
+            return Response(OrderedDict((
+                ("count", self.page.paginator.count),
+                ("count_exact", self.page.paginator.count_exact),
+                ("next", self.get_next_link()),
+                ("previous", self.get_previous_link()),
+                ("results", data),
+            )))
+        return Response(OrderedDict((
+            ("next", self._get_cursor_link(self.next_position)),
+            ("previous", self._get_cursor_link(
+                self.previous_position,
+                reverse=True,
+            )),
+            ("results", data),
+        )))
+
+    def _make_count_resolver(
+        self,
+        request,
+        view,
+    ) -> Callable[..., tuple[int, bool]]:
+        filter_params = sorted(
+            (key, sorted(values))
+            for key, values in request.query_params.lists()
+            if key not in {
+                self.page_query_param,
+                self.page_size_query_param,
+                self.cursor_query_param,
+            }
+        )
+
+        def resolve(queryset) -> tuple[int, bool]:
+            if not filter_params and getattr(
+                view, "estimated_count_allowed", False
+            ):
+                estimate = self._estimate_count(queryset)
+                if estimate is not None:
+                    return estimate, False
+            cache_key = self._get_count_cache_key(request, filter_params)
+            count = cache.get(cache_key)
+            if count is not None:
+                return count, False
+            count = queryset.count()
+            cache.set(cache_key, count, self.count_cache_timeout)
+            return count, True
+
+        return resolve
+
+    @staticmethod
+    def _get_count_cache_key(request, filter_params) -> str:
+        scopes = [RECIPES_SCOPE, USERS_SCOPE]
+        user_id = ""
+        if request.user.is_authenticated:
+            user_id = request.user.pk
+            scopes.append(viewer_scope(user_id))
+        digest = hashlib.md5(
+            json.dumps(
+                (request.path, user_id, filter_params, get_versions(scopes)),
+                ensure_ascii=False,
+            ).encode("utf-8")
+        ).hexdigest()
+        return f"pagination-count:{digest}"
+
+    def _estimate_count(self, queryset) -> Optional[int]:
+        connection = connections[queryset.db]
+        if connection.vendor != "postgresql":
+            return None
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT reltuples::bigint FROM pg_class "
+                "WHERE oid = %s::regclass",
+                (queryset.model._meta.db_table,),
+            )
+            row = cursor.fetchone()
+        if row is None or row[0] < self.count_estimate_threshold:
+            return None
+        return row[0]
+
+    def _paginate_by_cursor(self, queryset, request, view):
+        self.request = request
+        page_size = self.get_page_size(request)
+        if not page_size:
+            return None
+        self.ordering = self._get_keyset_ordering(queryset, view)
+        position, reverse = self._decode_cursor(request)
+        queryset = queryset.order_by(*(
+            f"-{name}" if descending != reverse else name
+            for name, descending in self.ordering
+        ))
+        if position is not None:
+            queryset = queryset.filter(
+                self._keyset_filter(position, reverse)
+            )
+        rows = list(queryset[:page_size + 1])
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        if reverse:
+            rows.reverse()
+            has_next, has_previous = position is not None, has_more
+        else:
+            has_next, has_previous = has_more, position is not None
+        self.next_position = (
+            self._get_position(rows[-1]) if rows and has_next else None
+        )
+        self.previous_position = (
+            self._get_position(rows[0]) if rows and has_previous else None
+        )
+        return rows
+
+    def _get_keyset_ordering(self, queryset, view):
+        ordering = (
+            getattr(view, "cursor_ordering", None)
+            or queryset.query.order_by
+            or queryset.model._meta.ordering
+        )
+        keyset = []
+        for field in ordering:
+            if not isinstance(field, str):
+                continue
+            name = field.lstrip("-")
+            if name == queryset.model._meta.pk.name:
+                name = "pk"
+            keyset.append((name, field.startswith("-")))
+        if "pk" not in {name for name, _ in keyset}:
+            keyset.append(("pk", False))
+        self.model = queryset.model
+        return keyset
+
+    def _keyset_filter(self, position, reverse) -> Q:
+        condition = Q()
+        equal = Q()
+        for (name, descending), value in zip(self.ordering, position):
+            lookup = "lt" if descending != reverse else "gt"
+            condition |= equal & Q(**{f"{name}__{lookup}": value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def _get_position(self, instance) -> list:
+        return [getattr(instance, name) for name, _ in self.ordering]
+
+    def _decode_cursor(self, request) -> tuple[Optional[list], bool]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            payload = json.loads(
+                base64.urlsafe_b64decode(encoded.encode("ascii"))
+            )
+            values = payload["p"]
+            reverse = bool(payload.get("r"))
+            if len(values) != len(self.ordering):
+                raise ValueError
+            position = [
+                self._get_field(name).to_python(value)
+                for (name, _), value in zip(self.ordering, values)
+            ]
+        except (
+            binascii.Error,
+            UnicodeError,
+            KeyError,
+            TypeError,
+            ValueError,
+            ValidationError,
+        ) as exc:
+            raise NotFound(self.invalid_cursor_message) from exc
+        return position, reverse
+
+    def _encode_cursor(self, position, reverse) -> str:
+        payload = {
+            "p": [
+                value.isoformat() if hasattr(value, "isoformat") else value
+                for value in position
+            ],
+        }
+        if reverse:
+            payload["r"] = 1
+        return base64.urlsafe_b64encode(
+            json.dumps(payload, separators=(",", ":")).encode("utf-8")
+        ).decode("ascii")
+
+    def _get_field(self, name):
+        if name == "pk":
+            return self.model._meta.pk
+        return self.model._meta.get_field(name)
+
+    def _get_cursor_link(self, position, reverse=False) -> Optional[str]:
+        if position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.page_query_param)
+        return replace_query_param(
+            url,
+            self.cursor_query_param,
+            self._encode_cursor(position, reverse),
+        )
@@ -0,0 +1,14 @@
+from rest_framework.parsers import MultiPartParser
+
+from core.uploads import ImageUploadLimitHandler
+
+
+class ImageUploadMultiPartParser(MultiPartParser):
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        request = parser_context["request"]
+        request.upload_handlers.insert(
+            0,
+            ImageUploadLimitHandler(request._request),
+        )
+        return super().parse(stream, media_type, parser_context)
@@ -0,0 +1,83 @@
+import csv
+import json
+from abc import ABCMeta, abstractmethod
+from typing import Iterable, Iterator
+
+from rest_framework.renderers import BaseRenderer, JSONRenderer
+
+from core.constants import SHOPPING_LIST_HEADER
+
+
+class EchoBuffer:
+
+    def write(self, value: str) -> str:
+        return value
+
+
+class ShoppingListRenderer(BaseRenderer, metaclass=ABCMeta):
+
+    charset = "utf-8"
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if isinstance(data, dict):
+            data = "\n".join(f"{key}: {value}" for key, value in data.items())
+        return str(data).encode(self.charset)
+
+    @abstractmethod
+    def stream(self, items: Iterable[dict]) -> Iterator[str]:
+        """Отдаёт список покупок по частям для потокового ответа."""
+
+
+class ShoppingListTextRenderer(ShoppingListRenderer):
+
+    media_type = "text/plain"
+    format = "txt"
+
+    def stream(self, items: Iterable[dict]) -> Iterator[str]:
+        yield f"{SHOPPING_LIST_HEADER}\n"
+        is_first = True
+        for item in items:
+            if is_first:
+                yield "\n"
+                is_first = False
+            yield "{name} — {total} {unit}\n".format(
+                name=item["ingredient__name"],
+                total=item["total"],
+                unit=item["ingredient__measurement_unit"],
+            )
+
+
+class ShoppingListCSVRenderer(ShoppingListRenderer):
+
+    media_type = "text/csv"
+    format = "csv"
+    header = ("Ингредиент", "Количество", "Единица измерения")
+
+    def stream(self, items: Iterable[dict]) -> Iterator[str]:
+        writer = csv.writer(EchoBuffer())
+        yield writer.writerow(self.header)
+        for item in items:
+            yield writer.writerow((
+                item["ingredient__name"],
+                item["total"],
+                item["ingredient__measurement_unit"],
+            ))
+
+
+class ShoppingListJSONRenderer(JSONRenderer):
+
+    format = "json"
+
+    def stream(self, items: Iterable[dict]) -> Iterator[str]:
+        separator = "["
+        for item in items:
+            yield separator + json.dumps(
+                {
+                    "name": item["ingredient__name"],
+                    "amount": item["total"],
+                    "measurement_unit": item["ingredient__measurement_unit"],
+                },
+                ensure_ascii=False,
+            )
+            separator = ","
+        yield "[]" if separator == "[" else "]"
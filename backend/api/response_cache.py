@@ -0,0 +1,116 @@
+import hashlib
+import time
+from datetime import datetime, timezone
+from typing import Iterable, Optional
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from rest_framework import status
+from rest_framework.response import Response
+
+from core.constants import RESPONSE_CACHE_TIMEOUT
+
+RESPONSE_CACHE_KEY_PREFIX = "response-cache:"
+VERSION_CACHE_KEY_PREFIX = "response-cache-version:"
+RECIPES_SCOPE = "recipes"
+USERS_SCOPE = "users"
+INGREDIENTS_SCOPE = "ingredients"
+
+
+def recipe_scope(recipe_id: int) -> str:
+    return f"recipe:{recipe_id}"
+
+
+def user_scope(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def viewer_scope(user_id: int) -> str:
+    return f"viewer:{user_id}"
+
+
+def version_timestamp(version: int) -> datetime:
+    return datetime.fromtimestamp(version / 1e9, tz=timezone.utc)
+
+
+def _version_key(scope: str) -> str:
+    return f"{VERSION_CACHE_KEY_PREFIX}{scope}"
+
+
+def get_versions(scopes: Iterable[str]) -> list[int]:
+    keys = [_version_key(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        version = time.time_ns()
+        for key in missing:
+            cache.add(key, version, timeout=None)
+        versions.update(cache.get_many(missing))
+    return [versions.get(key, 0) for key in keys]
+
+
+def bump_versions(*scopes: str) -> None:
+    version = time.time_ns()
+    cache.set_many(
+        {_version_key(scope): version for scope in scopes},
+        timeout=None,
+    )
+
+
+def bump_versions_on_commit(*scopes: str) -> None:
+    transaction.on_commit(lambda: bump_versions(*scopes))
+
+
+def build_cache_key(request, scopes: Iterable[str]) -> str:
+    scopes = tuple(scopes)
+    query = urlencode(
+        sorted(
+            (name, value)
+            for name, values in request.query_params.lists()
+            for value in values
+        )
+    )
+    location = hashlib.md5(
+        f"{request.build_absolute_uri(request.path)}?{query}".encode(),
+    ).hexdigest()
+    versions = ".".join(map(str, get_versions(scopes)))
+    return f"{RESPONSE_CACHE_KEY_PREFIX}{versions}:{location}"
+
+
+class AnonymousResponseCacheMixin:
+
+    def get_response_cache_scopes(self) -> Optional[tuple[str, ...]]:
+        return None
+
+    def list(self, request, *args, **kwargs):
+        return self._cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached_response(
+            super().retrieve, request, *args, **kwargs
+        )
+
+    def _cached_response(self, handler, request, *args, **kwargs):
+        scopes = self.get_response_cache_scopes()
+        if (
+            scopes is None
+            or request.user.is_authenticated
+            or request.accepted_renderer.format != "json"
+        ):
+            return handler(request, *args, **kwargs)
+        cache_key = build_cache_key(request, scopes)
+        data = cache.get(cache_key)
+        if data is not None:
+            return Response(data)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(
+                cache_key,
+                response.data,
+                getattr(
+                    settings, "RESPONSE_CACHE_TIMEOUT", RESPONSE_CACHE_TIMEOUT
+                ),
+            )
+        return response
@@ -1,13 +1,89 @@
+import uuid
+from typing import Iterable, Optional
+
+from django.core.files.uploadedfile import UploadedFile
+from django.urls import reverse
+from drf_extra_fields.fields import Base64ImageField
 from rest_framework import serializers
 
+from core.constants import IMAGE_VARIANT_FORMATS, IMAGE_VARIANT_URL_NAME
+from core.uploads import (
+    RejectedUploadedFile,
+    check_image_header,
+    read_image_header,
+)
+
+IMAGE_EXTENSIONS = {
+    "JPEG": "jpg",
+    "PNG": "png",
+    "WEBP": "webp",
+    "GIF": "gif",
+}
+
+
+def variant_url(name: str, width: int, image_format: str) -> str:
+    return reverse(
+        IMAGE_VARIANT_URL_NAME,
+        kwargs={"image_format": image_format, "width": width, "name": name},
+    )
+
 
 class AbsoluteURLImageField(serializers.ImageField):
 
+    def __init__(
+        self,
+        *args,
+        width: Optional[int] = None,
+        srcset: Iterable[int] = (),
+        image_format: str = IMAGE_VARIANT_FORMATS[0],
+        **kwargs,
+    ):
+        self.width = width
+        self.srcset = tuple(srcset)
+        self.image_format = image_format
+        super().__init__(*args, **kwargs)
+
     def to_representation(self, value):
+        if value and self.srcset:
+            return ", ".join(
+                "{url} {width}w".format(
+                    url=self._absolute_url(
+                        variant_url(value.name, width, self.image_format)
+                    ),
+                    width=width,
+                )
+                for width in self.srcset
+            )
+        if value and self.width:
+            return self._absolute_url(
+                variant_url(value.name, self.width, self.image_format)
+            )
         url = super().to_representation(value)
         if not url:
             return url
+        return self._absolute_url(url)
+
+    def _absolute_url(self, url: str) -> str:
         request = self.context.get("request")
         if request is None:
             return url
         return request.build_absolute_uri(url)
+
+
+class UploadedImageField(Base64ImageField):
+
+    def to_internal_value(self, data):
+        if isinstance(data, RejectedUploadedFile):
+            raise serializers.ValidationError(data.error)
+        if not isinstance(data, UploadedFile):
+            return super().to_internal_value(data)
+        try:
+            header = read_image_header(data)
+        except ValueError as exc:
+            raise serializers.ValidationError(str(exc)) from exc
+        error = check_image_header(header)
+        if error is not None:
+            raise serializers.ValidationError(error)
+        data.seek(0)
+        data.name = f"{uuid.uuid4()}.{IMAGE_EXTENSIONS[header.format]}"
+        return data
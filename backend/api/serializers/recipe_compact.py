@@ -1,14 +1,20 @@
 from rest_framework import serializers
 
 from api.serializers.fields import AbsoluteURLImageField
+from core.constants import IMAGE_VARIANT_SRCSET_WIDTHS
 from recipes.models import Recipe
 
 
 class RecipeCompactSerializer(serializers.ModelSerializer):
 
     image = AbsoluteURLImageField(read_only=True)
+    image_srcset = AbsoluteURLImageField(
+        source="image",
+        srcset=IMAGE_VARIANT_SRCSET_WIDTHS,
+        read_only=True,
+    )
 
     class Meta:
         model = Recipe
-        fields = ("id", "name", "image", "cooking_time")
+        fields = ("id", "name", "image", "image_srcset", "cooking_time")
         read_only_fields = fields
@@ -1,16 +1,28 @@
+import json
 from typing import Iterable
 
-from drf_extra_fields.fields import Base64ImageField
+from django.db import transaction
+from django.http import QueryDict
+from django.urls import reverse
 from rest_framework import serializers
 from rest_framework.exceptions import NotAuthenticated
 
-from api.serializers.fields import AbsoluteURLImageField
+from api.serializers.fields import AbsoluteURLImageField, UploadedImageField
+from api.serializers.resolvers import SubscriptionPrimingListSerializer
 from api.serializers.users import UserSerializer
 from core.constants import (
+    IMAGE_VARIANT_SRCSET_WIDTHS,
     MAX_INGREDIENT_AMOUNT,
     MIN_INGREDIENT_AMOUNT,
+    SHORT_LINK_URL_NAME,
+)
+from recipes import shopping_list
+from recipes.models import (
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    RecipeShortLink,
 )
-from recipes.models import Ingredient, Recipe, RecipeIngredient
 
 
 class IngredientSerializer(serializers.ModelSerializer):
@@ -48,6 +60,11 @@ class RecipeIngredientInputSerializer(serializers.Serializer):
     )
 
 
+class RecipeListSerializer(SubscriptionPrimingListSerializer):
+
+    author_id_attribute = "author_id"
+
+
 class RecipeReadSerializer(serializers.ModelSerializer):
 
     author = UserSerializer(read_only=True)
@@ -57,8 +74,14 @@ class RecipeReadSerializer(serializers.ModelSerializer):
         read_only=True,
     )
     image = AbsoluteURLImageField(read_only=True)
+    image_srcset = AbsoluteURLImageField(
+        source="image",
+        srcset=IMAGE_VARIANT_SRCSET_WIDTHS,
+        read_only=True,
+    )
     is_favorited = serializers.SerializerMethodField()
     is_in_shopping_cart = serializers.SerializerMethodField()
+    short_link = serializers.SerializerMethodField()
 
     class Meta:
         model = Recipe
@@ -70,18 +93,38 @@ class RecipeReadSerializer(serializers.ModelSerializer):
             "is_in_shopping_cart",
             "name",
             "image",
+            "image_srcset",
             "text",
             "cooking_time",
+            "short_link",
         )
         read_only_fields = fields
+        list_serializer_class = RecipeListSerializer
 
     def get_is_favorited(self, obj: Recipe) -> bool:
-        return self._check_relation(obj.favorites)
+        return self._check_relation(obj, "is_favorited", obj.favorites)
 
     def get_is_in_shopping_cart(self, obj: Recipe) -> bool:
-        return self._check_relation(obj.shopping_carts)
+        return self._check_relation(
+            obj,
+            "is_in_shopping_cart",
+            obj.shopping_carts,
+        )
 
-    def _check_relation(self, manager) -> bool:
+    def get_short_link(self, obj: Recipe) -> str:
+        url = reverse(
+            SHORT_LINK_URL_NAME,
+            args=(RecipeShortLink.get_code(obj),),
+        )
+        request = self.context.get("request")
+        if request is None:
+            return url
+        return request.build_absolute_uri(url)
+
+    def _check_relation(self, obj: Recipe, annotation: str, manager) -> bool:
+        annotated = getattr(obj, annotation, None)
+        if annotated is not None:
+            return bool(annotated)
         request = self.context.get("request")
         return bool(
             request
@@ -93,7 +136,7 @@ class RecipeReadSerializer(serializers.ModelSerializer):
 class RecipeWriteSerializer(serializers.ModelSerializer):
 
     ingredients = RecipeIngredientInputSerializer(many=True)
-    image = Base64ImageField()
+    image = UploadedImageField()
     author = serializers.HiddenField(default=serializers.CurrentUserDefault())
 
     class Meta:
@@ -128,6 +171,19 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
             )
         return attrs
 
+    def to_internal_value(self, data):
+        if isinstance(data, QueryDict):
+            data = data.dict()
+            ingredients = data.get("ingredients")
+            if isinstance(ingredients, str):
+                try:
+                    data["ingredients"] = json.loads(ingredients)
+                except ValueError as exc:
+                    raise serializers.ValidationError(
+                        {"ingredients": ["Ожидается список в формате JSON."]}
+                    ) from exc
+        return super().to_internal_value(data)
+
     def validate_image(self, value):
         if value in (None, ""):
             raise serializers.ValidationError(
@@ -145,10 +201,17 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
         self._set_ingredients(recipe, ingredients)
         return recipe
 
+    @transaction.atomic
     def update(self, instance: Recipe, validated_data: dict) -> Recipe:
         ingredients = validated_data.pop("ingredients")
+        old_amounts = shopping_list.get_recipe_amounts(instance.pk)
         instance.recipe_ingredients.all().delete()
         self._set_ingredients(instance, ingredients)
+        shopping_list.change_recipe(
+            instance.pk,
+            old_amounts,
+            {item["id"].pk: item["amount"] for item in ingredients},
+        )
         return super().update(instance, validated_data)
 
     def to_representation(self, instance: Recipe) -> dict:
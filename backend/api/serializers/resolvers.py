@@ -0,0 +1,81 @@
+from typing import Any, Hashable, Iterable
+
+from django.db.models.manager import BaseManager
+from rest_framework import serializers
+
+from users.models import Subscription
+
+REQUEST_ATTRIBUTE = "_subscription_resolver"
+
+
+class SubscriptionResolver:
+
+    def __init__(self, user) -> None:
+        self._user = user
+        self._subscribed: dict[int, bool] = {}
+        self._payloads: dict[Hashable, dict[str, Any]] = {}
+
+    @classmethod
+    def for_request(cls, request) -> "SubscriptionResolver":
+        resolver = getattr(request, REQUEST_ATTRIBUTE, None)
+        if resolver is None:
+            resolver = cls(request.user)
+            setattr(request, REQUEST_ATTRIBUTE, resolver)
+        return resolver
+
+    @property
+    def _is_anonymous(self) -> bool:
+        return self._user is None or not self._user.is_authenticated
+
+    def prime(self, author_ids: Iterable[int]) -> None:
+        if self._is_anonymous:
+            return
+        missing = {
+            author_id
+            for author_id in author_ids
+            if author_id is not None
+            and author_id != self._user.pk
+            and author_id not in self._subscribed
+        }
+        if not missing:
+            return
+        subscribed = set(
+            Subscription.objects.filter(
+                user=self._user,
+                author_id__in=missing,
+            ).values_list("author_id", flat=True)
+        )
+        for author_id in missing:
+            self._subscribed[author_id] = author_id in subscribed
+
+    def remember(self, author_ids: Iterable[int], subscribed: bool) -> None:
+        for author_id in author_ids:
+            self._subscribed[author_id] = subscribed
+
+    def is_subscribed(self, author_id: int) -> bool:
+        if self._is_anonymous or author_id == self._user.pk:
+            return False
+        if author_id not in self._subscribed:
+            self.prime((author_id,))
+        return self._subscribed[author_id]
+
+    def get_payload(self, key: Hashable):
+        payload = self._payloads.get(key)
+        return None if payload is None else dict(payload)
+
+    def store_payload(self, key: Hashable, payload: dict[str, Any]) -> None:
+        self._payloads[key] = dict(payload)
+
+
+class SubscriptionPrimingListSerializer(serializers.ListSerializer):
+
+    author_id_attribute = "pk"
+
+    def to_representation(self, data):
+        items = list(data.all() if isinstance(data, BaseManager) else data)
+        request = self.context.get("request")
+        if request is not None:
+            SubscriptionResolver.for_request(request).prime(
+                getattr(item, self.author_id_attribute) for item in items
+            )
+        return super().to_representation(items)
@@ -1,12 +1,18 @@
 from typing import Any, Optional
 
 from djoser.serializers import UserSerializer as DjoserUserSerializer
-from drf_extra_fields.fields import Base64ImageField
 from rest_framework import serializers
 
-from api.serializers.fields import AbsoluteURLImageField
+from api.serializers.fields import AbsoluteURLImageField, UploadedImageField
 from api.serializers.recipe_compact import RecipeCompactSerializer
-from core.constants import RECIPES_LIMIT_QUERY_PARAM
+from api.serializers.resolvers import (
+    SubscriptionPrimingListSerializer,
+    SubscriptionResolver,
+)
+from core.constants import (
+    AVATAR_VARIANT_SRCSET_WIDTHS,
+    RECIPES_LIMIT_QUERY_PARAM,
+)
 from users.models import User
 
 
@@ -14,31 +20,51 @@ class UserSerializer(DjoserUserSerializer):
 
     is_subscribed = serializers.SerializerMethodField()
     avatar = AbsoluteURLImageField(read_only=True)
+    avatar_srcset = AbsoluteURLImageField(
+        source="avatar",
+        srcset=AVATAR_VARIANT_SRCSET_WIDTHS,
+        read_only=True,
+    )
 
     class Meta(DjoserUserSerializer.Meta):
         model = User
         fields = DjoserUserSerializer.Meta.fields + (
             "is_subscribed",
             "avatar",
+            "avatar_srcset",
         )
         read_only_fields = getattr(
             DjoserUserSerializer.Meta,
             "read_only_fields",
             tuple(),
-        ) + ("is_subscribed", "avatar")
+        ) + ("is_subscribed", "avatar", "avatar_srcset")
+        list_serializer_class = SubscriptionPrimingListSerializer
+
+    def to_representation(self, instance: User) -> dict[str, Any]:
+        resolver = self._get_resolver()
+        if resolver is None or type(self) is not UserSerializer:
+            return super().to_representation(instance)
+        key = (type(self), instance.pk)
+        payload = resolver.get_payload(key)
+        if payload is None:
+            payload = super().to_representation(instance)
+            resolver.store_payload(key, payload)
+        return payload
 
     def get_is_subscribed(self, obj: User) -> bool:
+        resolver = self._get_resolver()
+        return bool(resolver and resolver.is_subscribed(obj.pk))
+
+    def _get_resolver(self) -> Optional[SubscriptionResolver]:
         request = self.context.get("request")
-        return bool(
-            request
-            and request.user.is_authenticated
-            and obj.subscribers.filter(user=request.user).exists()
-        )
+        if request is None:
+            return None
+        return SubscriptionResolver.for_request(request)
 
 
 class AvatarSerializer(serializers.ModelSerializer):
 
-    avatar = Base64ImageField()
+    avatar = UploadedImageField()
 
     class Meta:
         model = User
@@ -70,19 +96,24 @@ class SubscriptionSerializer(UserSerializer):
         )
 
     def get_recipes(self, obj: User) -> list[dict[str, Any]]:
-        recipes_limit = self._get_recipes_limit()
-        recipes_qs = obj.recipes.order_by("-created_at")
-        if recipes_limit is not None:
-            recipes_qs = recipes_qs[:recipes_limit]
+        recipes = getattr(obj, "latest_recipes", None)
+        if recipes is None:
+            recipes = obj.recipes.order_by("-created_at")
+            recipes_limit = self._get_recipes_limit()
+            if recipes_limit is not None:
+                recipes = recipes[:recipes_limit]
         serializer = RecipeCompactSerializer(
-            recipes_qs,
+            recipes,
             many=True,
             context=self.context,
         )
         return serializer.data
 
     def get_recipes_count(self, obj: User) -> int:
-        return obj.recipes.count()
+        recipes_count = getattr(obj, "recipes_count", None)
+        if recipes_count is None:
+            return obj.recipes.count()
+        return recipes_count
 
     def _get_recipes_limit(self) -> Optional[int]:
         value = self.context.get(RECIPES_LIMIT_QUERY_PARAM)
@@ -0,0 +1,146 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework.authtoken.models import Token
+
+from api.authentication import token_snapshot_cache
+from api.response_cache import (
+    INGREDIENTS_SCOPE,
+    RECIPES_SCOPE,
+    USERS_SCOPE,
+    bump_versions_on_commit,
+    recipe_scope,
+    user_scope,
+    viewer_scope,
+)
+from recipes.models import (
+    Favorite,
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    ShoppingCart,
+)
+from recipes.signals import deleted_in_bulk, recipes_bulk_created
+from users.models import Subscription
+from users.signals import users_bulk_updated
+
+User = get_user_model()
+
+PUBLIC_USER_FIELDS = frozenset(
+    ("email", "username", "first_name", "last_name", "avatar")
+)
+
+
+@receiver(post_delete, sender=Token)
+def forget_token(sender, instance, **kwargs):
+    """Сбрасывает кэш удалённого токена (выход, смена пароля)."""
+    transaction.on_commit(
+        lambda: token_snapshot_cache.invalidate(
+            instance.key, instance.user_id
+        )
+    )
+
+
+@receiver(post_save, sender=User)
+def forget_user_tokens(sender, instance, created, **kwargs):
+    """Сбрасывает кэш токенов пользователя после изменения профиля."""
+    if not created:
+        transaction.on_commit(
+            lambda: token_snapshot_cache.invalidate_user(instance.pk)
+        )
+
+
+@receiver(post_save, sender=Recipe)
+@receiver(post_delete, sender=Recipe)
+def invalidate_recipe_responses(sender, instance, **kwargs):
+    """Сбрасывает кэш ответов со списком рецептов и самим рецептом."""
+    bump_versions_on_commit(RECIPES_SCOPE, recipe_scope(instance.pk))
+
+
+@receiver(recipes_bulk_created)
+def invalidate_bulk_recipe_responses(sender, **kwargs):
+    """Сбрасывает кэш списка рецептов после загрузки пачки рецептов."""
+    bump_versions_on_commit(RECIPES_SCOPE)
+
+
+@receiver(post_save, sender=RecipeIngredient)
+@receiver(post_delete, sender=RecipeIngredient)
+def invalidate_recipe_ingredient_responses(
+    sender,
+    instance,
+    origin=None,
+    **kwargs,
+):
+    """Сбрасывает кэш ответов с рецептом, чей состав изменился."""
+    if deleted_in_bulk(origin):
+        return
+    bump_versions_on_commit(RECIPES_SCOPE, recipe_scope(instance.recipe_id))
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def invalidate_ingredient_responses(sender, **kwargs):
+    """Сбрасывает кэш ответов с рецептами после правки ингредиентов."""
+    bump_versions_on_commit(INGREDIENTS_SCOPE)
+
+
+@receiver(post_save, sender=User)
+def invalidate_user_responses(
+    sender, instance, created, update_fields=None, **kwargs
+):
+    """Сбрасывает кэш ответов с профилем пользователя и его рецептами."""
+    if created:
+        bump_versions_on_commit(USERS_SCOPE)
+        return
+    if update_fields is not None and PUBLIC_USER_FIELDS.isdisjoint(
+        update_fields
+    ):
+        return
+    recipe_scopes = [
+        recipe_scope(recipe_id)
+        for recipe_id in instance.recipes.values_list("pk", flat=True)
+    ]
+    bump_versions_on_commit(
+        user_scope(instance.pk),
+        USERS_SCOPE,
+        RECIPES_SCOPE,
+        *recipe_scopes,
+    )
+
+
+@receiver(users_bulk_updated)
+def invalidate_bulk_user_responses(sender, user_ids, **kwargs):
+    """Сбрасывает кэш профилей и токенов пользователей, изменённых пачкой."""
+    recipe_scopes = [
+        recipe_scope(recipe_id)
+        for recipe_id in Recipe.objects.filter(
+            author_id__in=user_ids
+        ).values_list("pk", flat=True)
+    ]
+    bump_versions_on_commit(
+        *map(user_scope, user_ids),
+        USERS_SCOPE,
+        RECIPES_SCOPE,
+        *recipe_scopes,
+    )
+    transaction.on_commit(
+        lambda: token_snapshot_cache.invalidate_users(user_ids)
+    )
+
+
+@receiver(post_delete, sender=User)
+def invalidate_deleted_user_responses(sender, instance, **kwargs):
+    """Сбрасывает кэш ответов с профилем удалённого пользователя."""
+    bump_versions_on_commit(user_scope(instance.pk), USERS_SCOPE)
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_delete, sender=Favorite)
+@receiver(post_save, sender=ShoppingCart)
+@receiver(post_delete, sender=ShoppingCart)
+@receiver(post_save, sender=Subscription)
+@receiver(post_delete, sender=Subscription)
+def invalidate_viewer_state(sender, instance, **kwargs):
+    """Меняет версию избранного, покупок и подписок пользователя."""
+    bump_versions_on_commit(viewer_scope(instance.user_id))
@@ -0,0 +1,239 @@
+import shutil
+import tempfile
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+from api.authentication import token_snapshot_cache
+from api.pagination import CountingPaginator
+from recipes import shopping_list
+from recipes.models import (
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    ShoppingCart,
+    ShoppingListItem,
+)
+from users.models import User
+
+MEDIA_ROOT = tempfile.mkdtemp()
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "api-tests",
+    }
+}
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT,
+    SHORT_LINK_SECRET="test",
+    CACHES=CACHES,
+)
+class CountedPaginationTests(TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.author = User.objects.create_user(
+            username="author",
+            email="author@example.com",
+            password="password",
+        )
+        self.reader = User.objects.create_user(
+            username="reader",
+            email="reader@example.com",
+            password="password",
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.reader)
+
+    def create_recipe(self, name="Рецепт"):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Recipe.objects.create(
+                author=self.author,
+                name=name,
+                text="Описание",
+                cooking_time=10,
+                image=SimpleUploadedFile("upload.png", b"image"),
+            )
+
+    def get_list(self, url):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_favorite_then_list_favorites(self):
+        recipe = self.create_recipe()
+        url = "/api/recipes/?is_favorited=1"
+        self.assertEqual(self.get_list(url)["count"], 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(f"/api/recipes/{recipe.pk}/favorite/")
+        self.assertEqual(response.status_code, 201)
+        data = self.get_list(url)
+        self.assertEqual(data["count"], 1)
+        self.assertEqual([item["id"] for item in data["results"]], [recipe.pk])
+
+    def test_subscribe_then_list_subscriptions(self):
+        url = "/api/users/subscriptions/"
+        self.assertEqual(self.get_list(url)["count"], 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                f"/api/users/{self.author.pk}/subscribe/"
+            )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(self.get_list(url)["count"], 1)
+
+    def test_new_recipe_is_reachable_after_cached_count(self):
+        for number in range(3):
+            self.create_recipe(f"Рецепт {number}")
+        url = "/api/recipes/?limit=3"
+        self.assertEqual(self.get_list(url)["count"], 3)
+        self.create_recipe("Новый рецепт")
+        data = self.get_list(url)
+        self.assertEqual(data["count"], 4)
+        self.assertIsNotNone(data["next"])
+        self.assertEqual(len(self.get_list(f"{url}&page=2")["results"]), 1)
+
+    def test_cached_count_is_reported_as_inexact(self):
+        self.create_recipe()
+        self.assertTrue(self.get_list("/api/recipes/")["count_exact"])
+        self.assertFalse(self.get_list("/api/recipes/")["count_exact"])
+
+
+class CountingPaginatorTests(TestCase):
+
+    def make_paginator(self, count):
+        return CountingPaginator(
+            list(range(5)),
+            2,
+            count_resolver=lambda object_list: (count, False),
+        )
+
+    def test_low_estimate_does_not_hide_rows(self):
+        self.assertTrue(self.make_paginator(2).page(1).has_next())
+        self.assertEqual(list(self.make_paginator(2).page(3)), [4])
+
+    def test_high_estimate_is_corrected_on_last_page(self):
+        paginator = self.make_paginator(100)
+        page = paginator.page(3)
+        self.assertEqual(list(page), [4])
+        self.assertFalse(page.has_next())
+        self.assertEqual(paginator.count, 5)
+
+    def test_page_past_the_end_is_clamped(self):
+        paginator = self.make_paginator(100)
+        page = paginator.page(9)
+        self.assertEqual((page.number, list(page)), (3, [4]))
+        self.assertTrue(paginator.count_exact)
+
+
+@override_settings(CACHES=CACHES)
+class CachedTokenAuthenticationTests(TestCase):
+
+    def setUp(self):
+        token_snapshot_cache.clear_local()
+        self.user = User.objects.create_user(
+            username="staff",
+            email="staff@example.com",
+            password="Old-password-1",
+            is_staff=True,
+        )
+        token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Token {token.key}")
+        self.assertEqual(self.client.get("/api/users/me/").status_code, 200)
+
+    def test_unsafe_request_does_not_write_back_snapshot(self):
+        User.objects.filter(pk=self.user.pk).update(is_staff=False)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/api/users/set_password/",
+                {
+                    "current_password": "Old-password-1",
+                    "new_password": "New-password-2",
+                },
+            )
+        self.assertEqual(response.status_code, 204)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_staff)
+
+    def test_version_bump_drops_local_snapshot(self):
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        token_snapshot_cache._bump_versions((self.user.pk,))
+        self.assertEqual(self.client.get("/api/users/me/").status_code, 401)
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT,
+    SHORT_LINK_SECRET="test",
+    CACHES=CACHES,
+)
+class RecipeUpdateShoppingListTests(TestCase):
+
+    def setUp(self):
+        self.author = User.objects.create_user(
+            username="author",
+            email="author@example.com",
+            password="password",
+        )
+        buyer = User.objects.create_user(
+            username="buyer",
+            email="buyer@example.com",
+            password="password",
+        )
+        self.ingredients = Ingredient.objects.bulk_create(
+            Ingredient(name=f"Ингредиент {number}", measurement_unit="г")
+            for number in range(4)
+        )
+        self.recipe = Recipe.objects.create(
+            author=self.author,
+            name="Рецепт",
+            text="Описание",
+            cooking_time=10,
+            image=SimpleUploadedFile("upload.png", b"image"),
+        )
+        RecipeIngredient.objects.bulk_create(
+            RecipeIngredient(
+                recipe=self.recipe,
+                ingredient=ingredient,
+                amount=1,
+            )
+            for ingredient in self.ingredients[:3]
+        )
+        ShoppingCart.objects.create(user=buyer, recipe=self.recipe)
+        self.client = APIClient()
+        self.client.force_authenticate(self.author)
+
+    def shopping_list_items(self):
+        return sorted(
+            ShoppingListItem.objects.values_list(
+                "user_id", "ingredient_id", "total_amount"
+            )
+        )
+
+    def test_update_applies_single_diff(self):
+        response = self.client.patch(
+            f"/api/recipes/{self.recipe.pk}/",
+            {
+                "ingredients": [
+                    {"id": ingredient.pk, "amount": 5}
+                    for ingredient in self.ingredients[1:]
+                ],
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, 200)
+        items = self.shopping_list_items()
+        shopping_list.rebuild()
+        self.assertEqual(items, self.shopping_list_items())
+        self.assertEqual(
+            [total for _, _, total in items],
+            [5, 5, 5],
+        )
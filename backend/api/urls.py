@@ -1,7 +1,13 @@
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
-from api.views import IngredientViewSet, RecipeViewSet, UserViewSet
+from api.views import (
+    ImageVariantView,
+    IngredientViewSet,
+    RecipeViewSet,
+    UserViewSet,
+)
+from core.constants import IMAGE_VARIANT_URL_NAME
 
 router = DefaultRouter()
 router.register("users", UserViewSet, basename="users")
@@ -11,4 +17,9 @@ router.register("ingredients", IngredientViewSet, basename="ingredients")
 urlpatterns = [
     path("", include(router.urls)),
     path("auth/", include("djoser.urls.authtoken")),
+    path(
+        "images/<str:image_format>/<int:width>/<path:name>",
+        ImageVariantView.as_view(),
+        name=IMAGE_VARIANT_URL_NAME,
+    ),
 ]
@@ -1,26 +1,45 @@
 from __future__ import annotations
 
-import io
-from typing import Iterable, Optional
-
-from django.db.models import Sum
-from django.http import FileResponse
-from django.shortcuts import get_object_or_404, redirect
+from typing import Optional
+
+from django.conf import settings
+from django.db.models import Count, F
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    StreamingHttpResponse,
+)
+from django.shortcuts import redirect
 from django.urls import reverse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.utils.http import content_disposition_header, parse_etags
 from django.views import View
-from django_filters.rest_framework import DjangoFilterBackend
 from djoser.conf import settings as djoser_settings
 from djoser.views import UserViewSet as DjoserUserViewSet
 from rest_framework import mixins, status, viewsets
 from rest_framework.decorators import action
-from rest_framework.exceptions import ValidationError
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.parsers import FormParser, JSONParser
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from rest_framework.permissions import IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
 
-from api.filters import IngredientFilter, RecipeFilter
+from api.conditional import (
+    ConditionalGetMixin,
+    accepts_encoding,
+    make_validators,
+    make_version_validators,
+)
+from api.filters import RecipeFilter
 from api.pagination import FoodgramPagination
+from api.parsers import ImageUploadMultiPartParser
 from api.permissions import IsAuthorOrReadOnly
+from api.renderers import (
+    ShoppingListCSVRenderer,
+    ShoppingListJSONRenderer,
+    ShoppingListTextRenderer,
+)
 from api.serializers import (
     AvatarSerializer,
     IngredientSerializer,
@@ -30,24 +49,47 @@ from api.serializers import (
     SubscriptionSerializer,
     UserSerializer,
 )
+from api.response_cache import (
+    INGREDIENTS_SCOPE,
+    RECIPES_SCOPE,
+    USERS_SCOPE,
+    AnonymousResponseCacheMixin,
+    recipe_scope,
+    user_scope,
+)
+from api.serializers.resolvers import SubscriptionResolver
 from core.constants import (
+    IMAGE_VARIANT_MAX_AGE,
+    INGREDIENT_SEARCH_QUERY_PARAM,
+    PAGE_SIZE_QUERY_PARAM,
     RECIPES_LIMIT_QUERY_PARAM,
-    SHOPPING_LIST_FILENAME,
-    SHOPPING_LIST_HEADER,
+    SHOPPING_LIST_BASENAME,
+    SHOPPING_LIST_CHUNK_SIZE,
     SHORT_LINK_URL_NAME,
 )
+from core.images import CONTENT_TYPES, image_variant_cache
 from recipes.models import (
     Favorite,
     Ingredient,
     Recipe,
-    RecipeIngredient,
     RecipeShortLink,
     ShoppingCart,
+    ShoppingListItem,
+)
+from recipes.catalog import (
+    catalog_version_timestamp,
+    get_catalog_version,
+    ingredient_catalog,
 )
+from recipes.short_link_cache import short_link_resolver
 from users.models import Subscription, User
 
 
-class UserViewSet(DjoserUserViewSet):
+class UserViewSet(
+    ConditionalGetMixin,
+    AnonymousResponseCacheMixin,
+    DjoserUserViewSet,
+):
 
     queryset = User.objects.all().order_by("email")
     serializer_class = UserSerializer
@@ -67,6 +109,36 @@ class UserViewSet(DjoserUserViewSet):
             return AvatarSerializer
         return super().get_serializer_class()
 
+    def get_response_cache_scopes(self):
+        if self.action == "retrieve":
+            return (user_scope(self.kwargs[self.lookup_field]),)
+        return None
+
+    def get_conditional_validators(self):
+        if self.action == "me":
+            user = self.request.user
+            return make_validators(self.request, (user.pk, user.updated_at))
+        if self.action == "list":
+            return make_version_validators(self.request, (USERS_SCOPE,))
+        if self.action == "retrieve":
+            try:
+                updated_at = (
+                    self.get_queryset()
+                    .filter(pk=self.kwargs[self.lookup_field])
+                    .values_list("updated_at", flat=True)
+                    .first()
+                )
+            except (TypeError, ValueError):
+                return None
+            if updated_at is None:
+                return None
+            return make_validators(
+                self.request,
+                (updated_at,),
+                timestamps=(updated_at,),
+            )
+        return None
+
     def get_serializer_context(self):
         context = super().get_serializer_context()
         if self.action in {"subscriptions", "subscribe"}:
@@ -84,9 +156,15 @@ class UserViewSet(DjoserUserViewSet):
     def subscriptions(self, request, *args, **kwargs):
         authors = (
             User.objects.filter(subscribers__user=request.user)
+            .annotate(recipes_count=Count("recipes"))
             .order_by("email")
         )
         page = self.paginate_queryset(authors)
+        self._attach_latest_recipes(page)
+        SubscriptionResolver.for_request(request).remember(
+            (author.pk for author in page),
+            subscribed=True,
+        )
         serializer = self.get_serializer(page, many=True)
         return self.get_paginated_response(serializer.data)
 
@@ -106,6 +184,10 @@ class UserViewSet(DjoserUserViewSet):
             )
             if not created:
                 raise ValidationError("Подписка уже оформлена.")
+            SubscriptionResolver.for_request(request).remember(
+                (author.pk,),
+                subscribed=True,
+            )
             serializer = self.get_serializer(author)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         deleted, _ = Subscription.objects.filter(
@@ -121,20 +203,35 @@ class UserViewSet(DjoserUserViewSet):
         methods=("put", "delete"),
         permission_classes=(IsAuthenticated,),
         url_path="me/avatar",
+        parser_classes=(
+            JSONParser,
+            FormParser,
+            ImageUploadMultiPartParser,
+        ),
     )
     def set_avatar(self, request, *args, **kwargs):
         user = request.user
         if request.method == "DELETE":
             if user.avatar:
-                user.avatar.delete(save=False)
                 user.avatar = None
-                user.save(update_fields=("avatar",))
+                user.save(update_fields=("avatar", "updated_at"))
             return Response(status=status.HTTP_204_NO_CONTENT)
         serializer = self.get_serializer(user, data=request.data)
         serializer.is_valid(raise_exception=True)
         serializer.save()
         return Response(serializer.data)
 
+    def _attach_latest_recipes(self, authors: list[User]) -> None:
+        recipes_by_author = {author.pk: [] for author in authors}
+        recipes = Recipe.objects.latest_by_author(
+            recipes_by_author,
+            limit=self._parse_recipes_limit(),
+        )
+        for recipe in recipes:
+            recipes_by_author[recipe.author_id].append(recipe)
+        for author in authors:
+            author.latest_recipes = recipes_by_author[author.pk]
+
     def _parse_recipes_limit(self) -> Optional[int]:
         value = self.request.query_params.get(RECIPES_LIMIT_QUERY_PARAM)
         if value is None:
@@ -160,21 +257,128 @@ class IngredientViewSet(
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     pagination_class = None
-    filter_backends = (DjangoFilterBackend,)
-    filterset_class = IngredientFilter
+    filter_backends = ()
     permission_classes = (AllowAny,)
 
+    def list(self, request, *args, **kwargs):
+        name = request.query_params.get(INGREDIENT_SEARCH_QUERY_PARAM, "")
+        limit = self._parse_limit()
+        if (
+            not name.strip()
+            and limit is None
+            and request.accepted_renderer.format == "json"
+        ):
+            return self._catalog_response(request)
+        return Response(ingredient_catalog.search(name, limit=limit))
+
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            pk = int(kwargs[self.lookup_field])
+        except (TypeError, ValueError) as exc:
+            raise NotFound from exc
+        entry = ingredient_catalog.get_snapshot().by_id.get(pk)
+        if entry is None:
+            raise NotFound
+        return Response(entry)
+
+    @staticmethod
+    def _catalog_response(request) -> HttpResponse:
+        snapshot = ingredient_catalog.get_snapshot()
+        etags = parse_etags(request.headers.get("If-None-Match", ""))
+        if snapshot.etag in etags or "*" in etags:
+            response = HttpResponse(status=status.HTTP_304_NOT_MODIFIED)
+        elif accepts_encoding(
+            request.headers.get("Accept-Encoding", ""), "gzip"
+        ):
+            response = HttpResponse(
+                snapshot.gzipped_payload,
+                content_type="application/json",
+            )
+            response["Content-Encoding"] = "gzip"
+        else:
+            response = HttpResponse(
+                snapshot.payload,
+                content_type="application/json",
+            )
+        response["ETag"] = snapshot.etag
+        patch_vary_headers(response, ("Accept-Encoding",))
+        patch_cache_control(response, public=True, no_cache=True)
+        return response
+
+    def _parse_limit(self) -> Optional[int]:
+        value = self.request.query_params.get(PAGE_SIZE_QUERY_PARAM)
+        if value is None:
+            return None
+        error_message = "Значение должно быть положительным целым числом."
+        try:
+            limit = int(value)
+        except (TypeError, ValueError) as exc:
+            raise ValidationError(
+                {PAGE_SIZE_QUERY_PARAM: [error_message]}
+            ) from exc
+        if limit < 1:
+            raise ValidationError({PAGE_SIZE_QUERY_PARAM: [error_message]})
+        return limit
+
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(
+    ConditionalGetMixin,
+    AnonymousResponseCacheMixin,
+    viewsets.ModelViewSet,
+):
 
     queryset = (
-        Recipe.objects.select_related("author").prefetch_related(
+        Recipe.objects.select_related("author", "short_link").prefetch_related(
             "recipe_ingredients__ingredient"
         )
     )
     permission_classes = (IsAuthenticatedOrReadOnly, IsAuthorOrReadOnly)
     filterset_class = RecipeFilter
     pagination_class = FoodgramPagination
+    parser_classes = (
+        JSONParser,
+        FormParser,
+        ImageUploadMultiPartParser,
+    )
+    estimated_count_allowed = True
+
+    def get_queryset(self):
+        return super().get_queryset().with_user_flags(self.request.user)
+
+    def get_response_cache_scopes(self):
+        if self.action == "list":
+            return (RECIPES_SCOPE, INGREDIENTS_SCOPE)
+        if self.action == "retrieve":
+            return (
+                recipe_scope(self.kwargs[self.lookup_field]),
+                INGREDIENTS_SCOPE,
+            )
+        return None
+
+    def get_conditional_validators(self):
+        if self.action == "list":
+            return make_version_validators(
+                self.request,
+                (RECIPES_SCOPE, INGREDIENTS_SCOPE),
+            )
+        if self.action != "retrieve":
+            return None
+        catalog_version = get_catalog_version()
+        try:
+            state = (
+                Recipe.objects.filter(pk=self.kwargs[self.lookup_field])
+                .values_list("updated_at", "author__updated_at")
+                .first()
+            )
+        except (TypeError, ValueError):
+            return None
+        if state is None:
+            return None
+        return make_validators(
+            self.request,
+            (*state, catalog_version),
+            timestamps=(*state, catalog_version_timestamp(catalog_version)),
+        )
 
     def get_serializer_class(self):
         if self.action in {"list", "retrieve"}:
@@ -225,19 +429,33 @@ class RecipeViewSet(viewsets.ModelViewSet):
         methods=("get",),
         permission_classes=(IsAuthenticated,),
         url_path="download_shopping_cart",
+        renderer_classes=(
+            ShoppingListTextRenderer,
+            ShoppingListCSVRenderer,
+            ShoppingListJSONRenderer,
+        ),
     )
     def download_shopping_cart(self, request, *args, **kwargs):
         items = (
-            RecipeIngredient.objects.filter(
-                recipe__shopping_carts__user=request.user
+            ShoppingListItem.objects.filter(user=request.user)
+            .values(
+                "ingredient__name",
+                "ingredient__measurement_unit",
+                total=F("total_amount"),
             )
-            .values("ingredient__name", "ingredient__measurement_unit")
-            .annotate(total=Sum("amount"))
             .order_by("ingredient__name")
         )
-        lines = self._build_shopping_list_lines(items)
-        content = self._render_shopping_list(lines)
-        return self._make_file_response(content)
+        renderer = request.accepted_renderer
+        rows = items.iterator(chunk_size=SHOPPING_LIST_CHUNK_SIZE)
+        response = StreamingHttpResponse(
+            renderer.stream(rows),
+            content_type=f"{renderer.media_type}; charset=utf-8",
+        )
+        response["Content-Disposition"] = content_disposition_header(
+            as_attachment=True,
+            filename=f"{SHOPPING_LIST_BASENAME}.{renderer.format}",
+        )
+        return response
 
     @action(
         detail=True,
@@ -247,12 +465,11 @@ class RecipeViewSet(viewsets.ModelViewSet):
     )
     def get_link(self, request, *args, **kwargs):
         recipe = self.get_object()
-        short_link, _ = RecipeShortLink.objects.get_or_create(
-            recipe=recipe,
-            defaults={"code": RecipeShortLink.generate_unique_code()},
-        )
         short_url = request.build_absolute_uri(
-            reverse(SHORT_LINK_URL_NAME, args=(short_link.code,))
+            reverse(
+                SHORT_LINK_URL_NAME,
+                args=(RecipeShortLink.get_code(recipe),),
+            )
         )
         return Response({"short-link": short_url})
 
@@ -277,41 +494,36 @@ class RecipeViewSet(viewsets.ModelViewSet):
             raise ValidationError("Рецепт не найден в списке.")
         return Response(status=status.HTTP_204_NO_CONTENT)
 
-    @staticmethod
-    def _build_shopping_list_lines(items: Iterable[dict]) -> list[str]:
-        return [
-            "{name} — {total} {unit}".format(
-                name=item["ingredient__name"],
-                total=item["total"],
-                unit=item["ingredient__measurement_unit"],
-            )
-            for item in items
-        ]
-
-    @staticmethod
-    def _render_shopping_list(lines: Iterable[str]) -> str:
-        lines = list(lines)
-        body = [SHOPPING_LIST_HEADER, ""]
-        body.extend(lines)
-        if lines:
-            body.append("")
-        return "\n".join(body)
-
-    @staticmethod
-    def _make_file_response(content: str) -> FileResponse:
-        buffer = io.BytesIO()
-        buffer.write(content.encode("utf-8"))
-        buffer.seek(0)
-        return FileResponse(
-            buffer,
-            as_attachment=True,
-            filename=SHOPPING_LIST_FILENAME,
-            content_type="text/plain; charset=utf-8",
-        )
-
 
 class RecipeShortLinkRedirectView(View):
 
     def get(self, request, code: str, *args, **kwargs):
-        short_link = get_object_or_404(RecipeShortLink, code=code)
-        return redirect(f"/recipes/{short_link.recipe.id}/")
+        recipe_id = short_link_resolver.resolve(code)
+        if recipe_id is None:
+            raise Http404
+        return redirect(f"/recipes/{recipe_id}/")
+
+
+class ImageVariantView(View):
+
+    def get(self, request, image_format: str, width: int, name: str):
+        variant = image_variant_cache.get(name, width, image_format)
+        if variant is None:
+            raise Http404
+        content_type = CONTENT_TYPES[image_format]
+        if getattr(settings, "IMAGE_VARIANT_ACCEL_REDIRECT", False):
+            response = HttpResponse(content_type=content_type)
+            response["X-Accel-Redirect"] = settings.MEDIA_URL + (
+                variant.relative_to(settings.MEDIA_ROOT).as_posix()
+            )
+        else:
+            response = FileResponse(
+                variant.open("rb"),
+                content_type=content_type,
+            )
+        patch_cache_control(
+            response,
+            public=True,
+            max_age=IMAGE_VARIANT_MAX_AGE,
+        )
+        return response
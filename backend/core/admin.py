@@ -0,0 +1,12 @@
+from django.contrib import admin
+
+from core.models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+
+    list_display = ("name", "status", "attempts", "run_after", "created_at")
+    search_fields = ("name",)
+    list_filter = ("status", "name")
+    readonly_fields = ("locked_at", "last_error", "created_at")
@@ -12,11 +12,64 @@ MIN_INGREDIENT_AMOUNT = 1
 MAX_INGREDIENT_AMOUNT = 2147483647
 
 DEFAULT_PAGE_SIZE = 6
+MAX_PAGE_SIZE = 100
 PAGE_SIZE_QUERY_PARAM = "limit"
+CURSOR_QUERY_PARAM = "cursor"
+COUNT_CACHE_TIMEOUT = 30
+CACHE_MAX_ENTRIES = 10000
+CACHE_CULL_FREQUENCY = 10
+COUNT_ESTIMATE_THRESHOLD = 100000
 RECIPES_LIMIT_QUERY_PARAM = "recipes_limit"
+INGREDIENT_SEARCH_QUERY_PARAM = "name"
+
+AUTH_TOKEN_CACHE_SIZE = 10000
+AUTH_TOKEN_CACHE_TIMEOUT = 60 * 5
+AUTH_TOKEN_LOCAL_TTL = 10
+
+RESPONSE_CACHE_TIMEOUT = 60 * 10
 
 SHORT_CODE_LENGTH = 6
+SHORT_CODE_CHECK_SPACE = 1000
 SHORT_LINK_URL_NAME = "recipe-short-link"
+SHORT_LINK_CACHE_SIZE = 10000
+SHORT_LINK_CACHE_TIMEOUT = 60 * 60 * 24
+SHORT_LINK_NEGATIVE_CACHE_TIMEOUT = 60
+SHORT_LINK_LOCAL_TTL = 60
+
+IMAGE_VARIANT_WIDTHS = (160, 320, 640, 960, 1280)
+IMAGE_VARIANT_SRCSET_WIDTHS = (320, 640, 960)
+AVATAR_VARIANT_SRCSET_WIDTHS = (160, 320)
+IMAGE_VARIANT_FORMATS = ("webp", "jpeg")
+IMAGE_VARIANT_QUALITY = 80
+IMAGE_VARIANT_CACHE_SIZE = 512 * 1024 * 1024
+IMAGE_VARIANT_EVICTION_RATIO = 0.9
+IMAGE_VARIANT_RESCAN_INTERVAL = 5 * 60
+IMAGE_VARIANT_URL_NAME = "image-variant"
+IMAGE_VARIANT_MAX_AGE = 60 * 60 * 24 * 30
+
+DEFAULT_AVATAR_DIR = "users/avatars/default/"
+DEFAULT_AVATAR_COUNT = 6
+DEFAULT_AVATAR_EXTENSIONS = (".png", ".jpg")
+
+IMAGE_UPLOAD_FORMATS = ("JPEG", "PNG", "WEBP", "GIF")
+IMAGE_UPLOAD_MAX_SIZE = 20 * 1024 * 1024
+IMAGE_UPLOAD_MAX_DIMENSION = 10000
+IMAGE_UPLOAD_MAX_PIXELS = 50_000_000
+IMAGE_UPLOAD_HEADER_SIZE = 256 * 1024
+
+JOB_MAX_ATTEMPTS = 5
+JOB_RETRY_DELAY = 30
+JOB_LOCK_TIMEOUT = 60 * 10
+JOB_WORKER_THREADS = 4
+JOB_POLL_INTERVAL = 1.0
+
+LOAD_BATCH_SIZE = 1000
+LOAD_READ_CHUNK_SIZE = 64 * 1024
+LOAD_IMAGE_THREADS = 4
+
+CLEANUP_MIN_AGE = 60 * 60
+CLEANUP_THREADS = 8
 
-SHOPPING_LIST_FILENAME = "shopping-list.txt"
+SHOPPING_LIST_BASENAME = "shopping-list"
+SHOPPING_LIST_CHUNK_SIZE = 500
 SHOPPING_LIST_HEADER = "Список покупок"
@@ -0,0 +1,180 @@
+import os
+import tempfile
+import time
+from pathlib import Path
+from threading import RLock
+from typing import Optional
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.utils._os import safe_join
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from core.constants import (
+    IMAGE_VARIANT_CACHE_SIZE,
+    IMAGE_VARIANT_EVICTION_RATIO,
+    IMAGE_VARIANT_FORMATS,
+    IMAGE_VARIANT_QUALITY,
+    IMAGE_VARIANT_RESCAN_INTERVAL,
+    IMAGE_VARIANT_WIDTHS,
+)
+
+TEMP_SUFFIX = ".tmp"
+CONTENT_TYPES = {
+    "jpeg": "image/jpeg",
+    "webp": "image/webp",
+}
+
+
+class ImageVariantCache:
+
+    def __init__(
+        self,
+        root: Path,
+        max_size: int = IMAGE_VARIANT_CACHE_SIZE,
+        quality: int = IMAGE_VARIANT_QUALITY,
+    ) -> None:
+        self.root = Path(root)
+        self.max_size = max_size
+        self.quality = quality
+        self._size: Optional[int] = None
+        self._scanned_at = 0.0
+        self._lock = RLock()
+
+    def get(self, name: str, width: int, image_format: str) -> Optional[Path]:
+        if (
+            width not in IMAGE_VARIANT_WIDTHS
+            or image_format not in IMAGE_VARIANT_FORMATS
+        ):
+            return None
+        try:
+            source = Path(safe_join(settings.MEDIA_ROOT, name))
+            variant = Path(
+                safe_join(
+                    self.root,
+                    image_format,
+                    str(width),
+                    f"{name}.{image_format}",
+                )
+            )
+            source_mtime = source.stat().st_mtime
+        except (FileNotFoundError, SuspiciousFileOperation):
+            return None
+        if self.root in source.parents:
+            return None
+        stale_size = 0
+        try:
+            stat = variant.stat()
+            if stat.st_mtime >= source_mtime:
+                os.utime(variant)
+                return variant
+            stale_size = stat.st_size
+        except FileNotFoundError:
+            pass
+        try:
+            self._render(source, variant, width, image_format)
+            size = variant.stat().st_size
+        except (OSError, UnidentifiedImageError, Image.DecompressionBombError):
+            return None
+        self._record(size - stale_size)
+        return variant
+
+    def evict(self) -> None:
+        with self._lock:
+            files, total = self._scan()
+            if total > self.max_size:
+                target = self.max_size * IMAGE_VARIANT_EVICTION_RATIO
+                for _, size, path in sorted(files):
+                    try:
+                        os.remove(path)
+                    except FileNotFoundError:
+                        pass
+                    total -= size
+                    if total <= target:
+                        break
+            self._size = total
+            self._scanned_at = time.monotonic()
+
+    def _record(self, delta: int) -> None:
+        # Каталог обходится только при превышении бюджета или раз в
+        # IMAGE_VARIANT_RESCAN_INTERVAL секунд, чтобы учесть варианты,
+        # записанные другими процессами.
+        with self._lock:
+            if (
+                self._size is not None
+                and time.monotonic() - self._scanned_at
+                < IMAGE_VARIANT_RESCAN_INTERVAL
+            ):
+                self._size += delta
+                if self._size <= self.max_size:
+                    return
+            self.evict()
+
+    def _scan(self) -> tuple[list[tuple[float, int, str]], int]:
+        files = []
+        total = 0
+        for directory, _, names in os.walk(self.root):
+            for file_name in names:
+                if file_name.endswith(TEMP_SUFFIX):
+                    continue
+                path = os.path.join(directory, file_name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, path))
+                total += stat.st_size
+        return files, total
+
+    def _render(
+        self,
+        source: Path,
+        variant: Path,
+        width: int,
+        image_format: str,
+    ) -> None:
+        with Image.open(source) as image:
+            image.draft("RGB", (width, width))
+            image = ImageOps.exif_transpose(image)
+            if image.width > width:
+                image.thumbnail((width, image.height), Image.LANCZOS)
+            if image_format == "jpeg":
+                mode = "RGB"
+            elif image.mode in {"RGBA", "LA", "PA"} or (
+                "transparency" in image.info
+            ):
+                mode = "RGBA"
+            else:
+                mode = "RGB"
+            if image.mode != mode:
+                image = image.convert(mode)
+            variant.parent.mkdir(parents=True, exist_ok=True)
+            descriptor, temp_path = tempfile.mkstemp(
+                dir=variant.parent,
+                suffix=TEMP_SUFFIX,
+            )
+            try:
+                with os.fdopen(descriptor, "wb") as temp_file:
+                    image.save(
+                        temp_file,
+                        format=image_format.upper(),
+                        quality=self.quality,
+                        optimize=image_format == "jpeg",
+                    )
+                os.replace(temp_path, variant)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+
+
+image_variant_cache = ImageVariantCache(
+    root=getattr(
+        settings,
+        "IMAGE_VARIANT_ROOT",
+        Path(settings.MEDIA_ROOT) / "variants",
+    ),
+    max_size=getattr(
+        settings, "IMAGE_VARIANT_CACHE_SIZE", IMAGE_VARIANT_CACHE_SIZE
+    ),
+    quality=getattr(settings, "IMAGE_VARIANT_QUALITY", IMAGE_VARIANT_QUALITY),
+)
@@ -0,0 +1,141 @@
+import dataclasses
+import logging
+import traceback
+from datetime import timedelta
+from typing import Any, Callable, NamedTuple, Optional
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from core.constants import JOB_LOCK_TIMEOUT, JOB_MAX_ATTEMPTS, JOB_RETRY_DELAY
+from core.models import Job
+
+logger = logging.getLogger(__name__)
+
+
+class Task(NamedTuple):
+
+    func: Callable[[Any], None]
+    payload_type: type
+
+
+_tasks: dict[str, Task] = {}
+
+
+def task(name: str, payload_type: type):
+    if not dataclasses.is_dataclass(payload_type):
+        raise ImproperlyConfigured(
+            f"Параметры задачи {name} должны быть dataclass."
+        )
+
+    def decorator(func):
+        if name in _tasks:
+            raise ImproperlyConfigured(f"Задача {name} уже объявлена.")
+        _tasks[name] = Task(func, payload_type)
+        return func
+
+    return decorator
+
+
+def get_task(name: str) -> Task:
+    try:
+        return _tasks[name]
+    except KeyError as exc:
+        raise LookupError(f"Неизвестная задача: {name}.") from exc
+
+
+def enqueue(
+    name: str,
+    payload: Any,
+    *,
+    delay: Optional[timedelta] = None,
+    max_attempts: Optional[int] = None,
+) -> Job:
+    payload_type = get_task(name).payload_type
+    if not isinstance(payload, payload_type):
+        raise TypeError(
+            f"Задача {name} ожидает {payload_type.__name__}, "
+            f"получено {type(payload).__name__}."
+        )
+    return Job.objects.create(
+        name=name,
+        payload=dataclasses.asdict(payload),
+        run_after=timezone.now() + (delay or timedelta()),
+        max_attempts=max_attempts
+        or getattr(settings, "JOB_MAX_ATTEMPTS", JOB_MAX_ATTEMPTS),
+    )
+
+
+def enqueue_on_commit(name: str, payload: Any, **kwargs) -> None:
+    get_task(name)
+    transaction.on_commit(lambda: enqueue(name, payload, **kwargs))
+
+
+def claim_jobs(limit: int) -> list[Job]:
+    now = timezone.now()
+    lock_timeout = timedelta(
+        seconds=getattr(settings, "JOB_LOCK_TIMEOUT", JOB_LOCK_TIMEOUT)
+    )
+    ready = Q(status=Job.Status.PENDING, run_after__lte=now) | Q(
+        status=Job.Status.RUNNING,
+        locked_at__lt=now - lock_timeout,
+    )
+    claim = {
+        "status": Job.Status.RUNNING,
+        "locked_at": now,
+        "attempts": F("attempts") + 1,
+    }
+    queryset = Job.objects.filter(ready).order_by("run_after", "pk")
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            job_ids = list(
+                queryset.select_for_update(skip_locked=True).values_list(
+                    "pk",
+                    flat=True,
+                )[:limit]
+            )
+            Job.objects.filter(pk__in=job_ids).update(**claim)
+    else:
+        job_ids = [
+            job_id
+            for job_id in queryset.values_list("pk", flat=True)[:limit]
+            if Job.objects.filter(ready, pk=job_id).update(**claim)
+        ]
+    return list(Job.objects.filter(pk__in=job_ids).order_by("run_after"))
+
+
+def run_job(job: Job) -> bool:
+    close_old_connections()
+    try:
+        task = get_task(job.name)
+        task.func(task.payload_type(**job.payload))
+    except Exception:
+        logger.exception("Задача %s завершилась с ошибкой.", job)
+        _fail(job, traceback.format_exc())
+        return False
+    else:
+        Job.objects.filter(pk=job.pk).delete()
+        return True
+    finally:
+        close_old_connections()
+
+
+def _fail(job: Job, error: str) -> None:
+    if job.attempts >= job.max_attempts:
+        Job.objects.filter(pk=job.pk).update(
+            status=Job.Status.FAILED,
+            locked_at=None,
+            last_error=error,
+        )
+        return
+    retry_delay = getattr(settings, "JOB_RETRY_DELAY", JOB_RETRY_DELAY)
+    Job.objects.filter(pk=job.pk).update(
+        status=Job.Status.PENDING,
+        locked_at=None,
+        last_error=error,
+        run_after=timezone.now()
+        + timedelta(seconds=retry_delay * 2 ** (job.attempts - 1)),
+    )
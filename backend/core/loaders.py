@@ -0,0 +1,77 @@
+import csv
+import json
+from itertools import islice
+from pathlib import Path
+from typing import Any, Iterable, Iterator, TypeVar
+
+from core.constants import LOAD_READ_CHUNK_SIZE
+
+JSON_WHITESPACE = " \t\r\n"
+
+Item = TypeVar("Item")
+
+
+def chunked(items: Iterable[Item], size: int) -> Iterator[list[Item]]:
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def iter_csv_rows(path: Path) -> Iterator[list[str]]:
+    with path.open(encoding="utf-8", newline="") as file:
+        yield from csv.reader(file)
+
+
+def iter_json_array(
+    path: Path,
+    chunk_size: int = LOAD_READ_CHUNK_SIZE,
+) -> Iterator[Any]:
+    decoder = json.JSONDecoder()
+    with path.open(encoding="utf-8") as file:
+        buffer = ""
+        eof = False
+        started = False
+        # Ожидается значение (после "[" или ","), иначе разделитель.
+        expect_value = True
+        first = True
+        while True:
+            buffer = buffer.lstrip(JSON_WHITESPACE)
+            if not buffer:
+                pass
+            elif not started:
+                if not buffer.startswith("["):
+                    raise ValueError("Ожидался JSON-массив.")
+                buffer = buffer[1:]
+                started = True
+                continue
+            elif buffer.startswith("]"):
+                if expect_value and not first:
+                    raise ValueError("Лишняя запятая в JSON-массиве.")
+                return
+            elif not expect_value:
+                if not buffer.startswith(","):
+                    raise ValueError(
+                        "Ожидалась запятая между элементами JSON-массива."
+                    )
+                buffer = buffer[1:]
+                expect_value = True
+                continue
+            elif buffer.startswith(","):
+                raise ValueError("Лишняя запятая в JSON-массиве.")
+            else:
+                try:
+                    item, end = decoder.raw_decode(buffer)
+                except json.JSONDecodeError:
+                    if eof:
+                        raise
+                else:
+                    if end < len(buffer) or eof:
+                        yield item
+                        buffer = buffer[end:]
+                        expect_value = first = False
+                        continue
+            if eof:
+                raise ValueError("JSON-массив не завершён.")
+            chunk = file.read(chunk_size)
+            eof = not chunk
+            buffer += chunk
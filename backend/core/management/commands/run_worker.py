@@ -0,0 +1,81 @@
+import signal
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.constants import JOB_POLL_INTERVAL, JOB_WORKER_THREADS
+from core.jobs import claim_jobs, run_job
+
+
+class Command(BaseCommand):
+    help = (
+        "Выполняет фоновые задачи из таблицы задач в пуле потоков."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=getattr(
+                settings,
+                "JOB_WORKER_THREADS",
+                JOB_WORKER_THREADS,
+            ),
+            help="Количество потоков-исполнителей.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            dest="poll_interval",
+            type=float,
+            default=JOB_POLL_INTERVAL,
+            help="Пауза между опросами очереди, секунд.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Выполнить готовые задачи и завершиться.",
+        )
+
+    def handle(self, *args, **options):
+        threads = options["threads"]
+        if threads < 1:
+            raise CommandError("Нужен хотя бы один поток.")
+        poll_interval = options["poll_interval"]
+        self.stopping = False
+        signal.signal(signal.SIGTERM, self._stop)
+        signal.signal(signal.SIGINT, self._stop)
+
+        succeeded = failed = 0
+        running = set()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            while True:
+                if not self.stopping and len(running) < threads:
+                    for job in claim_jobs(threads - len(running)):
+                        running.add(pool.submit(run_job, job))
+                if not running:
+                    if self.stopping or options["once"]:
+                        break
+                    time.sleep(poll_interval)
+                    continue
+                done, running = wait(
+                    running,
+                    timeout=poll_interval,
+                    return_when=FIRST_COMPLETED,
+                )
+                for future in done:
+                    if future.result():
+                        succeeded += 1
+                    else:
+                        failed += 1
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Обработчик остановлен. Выполнено: {succeeded}, "
+                f"с ошибкой: {failed}."
+            )
+        )
+
+    def _stop(self, signum, frame):
+        self.stopping = True
@@ -0,0 +1,183 @@
+import threading
+import weakref
+from typing import Iterable, NamedTuple, Optional
+
+from django.db import DEFAULT_DB_ALIAS, models, transaction
+from django.db.models.signals import post_save, pre_save
+
+from core.jobs import enqueue, get_task
+from core.tasks import DeleteFilesPayload
+
+DELETE_FILES_TASK = "media.delete_files"
+ORIGINAL_FILES_ATTR = "_original_files"
+
+
+class TrackedFileFields(NamedTuple):
+
+    field_names: tuple[str, ...]
+    shared_prefixes: tuple[str, ...] = ()
+
+
+tracked_file_fields: dict[type[models.Model], TrackedFileFields] = {}
+
+_pending = threading.local()
+
+
+class FileDeletionBatch:
+    """Файлы одного вызова delete_files_on_commit.
+
+    Пока батч ждёт коммита, на него ссылается только очередь on_commit
+    соединения: при откате транзакции или точки сохранения Django
+    выбрасывает его, и слабая ссылка в _pending пропадает. Первый
+    выполненный при коммите батч ставит одну задачу на все уцелевшие.
+    """
+
+    def __init__(self, names: list[str], using: str) -> None:
+        self.names = names
+        self.using = using
+
+    def __call__(self) -> None:
+        pending = _pending_batches(self.using)
+        names = []
+        for batch in (self, *pending):
+            names.extend(batch.names)
+            batch.names = []
+        pending.clear()
+        if names:
+            enqueue(
+                DELETE_FILES_TASK,
+                DeleteFilesPayload(names=list(dict.fromkeys(names))),
+            )
+
+
+def _pending_batches(using: str) -> "weakref.WeakSet[FileDeletionBatch]":
+    batches = getattr(_pending, "batches", None)
+    if batches is None:
+        batches = _pending.batches = {}
+    return batches.setdefault(using, weakref.WeakSet())
+
+
+def delete_files_on_commit(
+    names: Iterable[str],
+    using: Optional[str] = None,
+) -> None:
+    names = [name for name in names if name]
+    if not names:
+        return
+    get_task(DELETE_FILES_TASK)
+    using = using or DEFAULT_DB_ALIAS
+    batch = FileDeletionBatch(names, using)
+    _pending_batches(using).add(batch)
+    transaction.on_commit(batch, using=using)
+
+
+class TrackedFilesMixin:
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        model = cls._meta.concrete_model
+        if model in tracked_file_fields:
+            remember_files(model, instance)
+        return instance
+
+
+def track_file_fields(
+    model: type[models.Model],
+    *field_names: str,
+    shared_prefixes: Iterable[str] = (),
+) -> None:
+    tracked_file_fields[model] = TrackedFileFields(
+        field_names,
+        tuple(shared_prefixes),
+    )
+    pre_save.connect(
+        load_deferred_files,
+        sender=model,
+        dispatch_uid=f"load_deferred_files:{model._meta.label}",
+    )
+    post_save.connect(
+        delete_replaced_files,
+        sender=model,
+        dispatch_uid=f"delete_replaced_files:{model._meta.label}",
+    )
+
+
+def remember_files(
+    model: type[models.Model],
+    instance: models.Model,
+    field_names: Iterable[str] = (),
+) -> None:
+    values = vars(instance)
+    originals = values.setdefault(ORIGINAL_FILES_ATTR, {})
+    for field_name in field_names or tracked_file_fields[model].field_names:
+        if field_name in values:
+            originals[field_name] = _file_name(values[field_name])
+
+
+def load_deferred_files(
+    sender,
+    instance,
+    raw=False,
+    using=None,
+    update_fields=None,
+    **kwargs,
+) -> None:
+    if raw or instance._state.adding:
+        return
+    originals = vars(instance).get(ORIGINAL_FILES_ATTR, {})
+    missing = [
+        field_name
+        for field_name in _saved_fields(sender, update_fields)
+        if field_name not in originals
+    ]
+    if not missing:
+        return
+    row = (
+        sender._base_manager.using(using)
+        .filter(pk=instance.pk)
+        .values_list(*missing)
+        .first()
+    )
+    if row is not None:
+        originals.update(zip(missing, map(_file_name, row)))
+
+
+def delete_replaced_files(
+    sender,
+    instance,
+    created=False,
+    raw=False,
+    using=None,
+    update_fields=None,
+    **kwargs,
+) -> None:
+    saved_fields = _saved_fields(sender, update_fields)
+    if not saved_fields:
+        return
+    originals = vars(instance).get(ORIGINAL_FILES_ATTR, {})
+    shared_prefixes = tracked_file_fields[sender].shared_prefixes
+    if not created and not raw:
+        replaced = []
+        for field_name in saved_fields:
+            if field_name not in originals:
+                continue
+            original = originals[field_name]
+            if original.startswith(shared_prefixes):
+                continue
+            if original != _file_name(getattr(instance, field_name)):
+                replaced.append(original)
+        delete_files_on_commit(replaced, using=using)
+    remember_files(sender, instance, field_names=saved_fields)
+
+
+def _saved_fields(sender, update_fields) -> tuple[str, ...]:
+    return tuple(
+        field_name
+        for field_name in tracked_file_fields[sender].field_names
+        if update_fields is None or field_name in update_fields
+    )
+
+
+def _file_name(value) -> str:
+    return getattr(value, "name", value) or ""
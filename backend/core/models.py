@@ -0,0 +1,64 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+
+    class Status(models.TextChoices):
+        PENDING = "pending", "Ожидает"
+        RUNNING = "running", "Выполняется"
+        FAILED = "failed", "Ошибка"
+
+    name = models.CharField(
+        verbose_name="Задача",
+        max_length=128,
+    )
+    payload = models.JSONField(
+        verbose_name="Параметры",
+        default=dict,
+        blank=True,
+    )
+    status = models.CharField(
+        verbose_name="Статус",
+        max_length=16,
+        choices=Status.choices,
+        default=Status.PENDING,
+    )
+    attempts = models.PositiveSmallIntegerField(
+        verbose_name="Попыток",
+        default=0,
+    )
+    max_attempts = models.PositiveSmallIntegerField(
+        verbose_name="Максимум попыток",
+    )
+    run_after = models.DateTimeField(
+        verbose_name="Выполнить после",
+        default=timezone.now,
+    )
+    locked_at = models.DateTimeField(
+        verbose_name="Взята в работу",
+        null=True,
+        blank=True,
+    )
+    last_error = models.TextField(
+        verbose_name="Последняя ошибка",
+        blank=True,
+    )
+    created_at = models.DateTimeField(
+        verbose_name="Создана",
+        auto_now_add=True,
+    )
+
+    class Meta:
+        verbose_name = "Фоновая задача"
+        verbose_name_plural = "Фоновые задачи"
+        ordering = ("run_after", "pk")
+        indexes = (
+            models.Index(
+                fields=("status", "run_after"),
+                name="core_job_status_run_after_idx",
+            ),
+        )
+
+    def __str__(self) -> str:
+        return f"{self.name} #{self.pk}"
@@ -0,0 +1,17 @@
+from dataclasses import dataclass
+
+from django.core.files.storage import default_storage
+
+from core.jobs import task
+
+
+@dataclass(frozen=True)
+class DeleteFilesPayload:
+
+    names: list[str]
+
+
+@task("media.delete_files", DeleteFilesPayload)
+def delete_files(payload: DeleteFilesPayload) -> None:
+    for name in payload.names:
+        default_storage.delete(name)
@@ -0,0 +1,87 @@
+import shutil
+import tempfile
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import transaction
+from django.test import TestCase, override_settings
+
+from core.models import Job
+from recipes.models import Recipe
+from users.models import User
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, SHORT_LINK_SECRET="test")
+class ReplacedFilesTests(TestCase):
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.author = User.objects.create_user(
+            username="author",
+            email="author@example.com",
+            password="password",
+        )
+
+    def create_recipe(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Recipe.objects.create(
+                author=self.author,
+                name="Рецепт",
+                text="Описание",
+                cooking_time=10,
+                image=SimpleUploadedFile("upload.png", b"image"),
+            )
+
+    def test_create_with_image_queues_no_deletion(self):
+        self.create_recipe()
+        self.assertFalse(Job.objects.exists())
+
+    def test_replacing_image_queues_old_file(self):
+        recipe = Recipe.objects.get(pk=self.create_recipe().pk)
+        old_name = recipe.image.name
+        recipe.image = SimpleUploadedFile("new.png", b"image")
+        with self.captureOnCommitCallbacks(execute=True):
+            recipe.save()
+        job = Job.objects.get()
+        self.assertEqual(job.payload, {"names": [old_name]})
+
+    def test_unrelated_update_issues_no_query(self):
+        recipe = Recipe.objects.get(pk=self.create_recipe().pk)
+        recipe.name = "Другой рецепт"
+        with self.assertNumQueries(1):
+            recipe.save(update_fields=("name",))
+        self.assertFalse(Job.objects.exists())
+
+    def test_replacements_in_one_transaction_share_a_job(self):
+        first = Recipe.objects.get(pk=self.create_recipe().pk)
+        second = Recipe.objects.get(pk=self.create_recipe().pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                for recipe in (first, second):
+                    recipe.image = SimpleUploadedFile("new.png", b"image")
+                    recipe.save()
+        job = Job.objects.get()
+        self.assertEqual(len(job.payload["names"]), 2)
+
+    def test_rolled_back_savepoint_keeps_old_file(self):
+        first = Recipe.objects.get(pk=self.create_recipe().pk)
+        second = Recipe.objects.get(pk=self.create_recipe().pk)
+        old_name = first.image.name
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                first.image = SimpleUploadedFile("new.png", b"image")
+                first.save()
+                try:
+                    with transaction.atomic():
+                        second.image = SimpleUploadedFile("new.png", b"x")
+                        second.save()
+                        raise RuntimeError
+                except RuntimeError:
+                    pass
+        job = Job.objects.get()
+        self.assertEqual(job.payload, {"names": [old_name]})
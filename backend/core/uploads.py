@@ -0,0 +1,118 @@
+from io import BytesIO
+from typing import IO, NamedTuple, Optional
+
+from django.core.files.uploadedfile import UploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+from PIL import Image
+
+from core.constants import (
+    IMAGE_UPLOAD_FORMATS,
+    IMAGE_UPLOAD_HEADER_SIZE,
+    IMAGE_UPLOAD_MAX_DIMENSION,
+    IMAGE_UPLOAD_MAX_PIXELS,
+    IMAGE_UPLOAD_MAX_SIZE,
+)
+
+INVALID_IMAGE_MESSAGE = "Загрузите корректное изображение."
+FORMAT_MESSAGE = "Допустимые форматы изображений: {formats}."
+DIMENSION_MESSAGE = (
+    "Изображение слишком большое: {width}×{height}, "
+    "допустимо не более {max_dimension} точек по стороне "
+    "и {max_pixels} точек всего."
+)
+SIZE_MESSAGE = "Размер файла не должен превышать {max_size} байт."
+
+
+class ImageHeader(NamedTuple):
+
+    format: str
+    width: int
+    height: int
+
+
+def read_image_header(file: IO[bytes]) -> ImageHeader:
+    try:
+        with Image.open(file) as image:
+            return ImageHeader(image.format, image.width, image.height)
+    except (
+        OSError,
+        SyntaxError,
+        ValueError,
+        Image.DecompressionBombError,
+    ) as exc:
+        raise ValueError(INVALID_IMAGE_MESSAGE) from exc
+
+
+def check_image_header(header: ImageHeader) -> Optional[str]:
+    if header.format not in IMAGE_UPLOAD_FORMATS:
+        return FORMAT_MESSAGE.format(formats=", ".join(IMAGE_UPLOAD_FORMATS))
+    if (
+        max(header.width, header.height) > IMAGE_UPLOAD_MAX_DIMENSION
+        or header.width * header.height > IMAGE_UPLOAD_MAX_PIXELS
+    ):
+        return DIMENSION_MESSAGE.format(
+            width=header.width,
+            height=header.height,
+            max_dimension=IMAGE_UPLOAD_MAX_DIMENSION,
+            max_pixels=IMAGE_UPLOAD_MAX_PIXELS,
+        )
+    return None
+
+
+class RejectedUploadedFile(UploadedFile):
+
+    def __init__(self, name: str, content_type: str, error: str) -> None:
+        super().__init__(
+            file=BytesIO(),
+            name=name,
+            content_type=content_type,
+            size=0,
+        )
+        self.error = error
+
+
+class ImageUploadLimitHandler(FileUploadHandler):
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.received = 0
+        self.head = bytearray()
+        self.inspected = False
+        self.error = None
+        if (self.content_length or 0) > IMAGE_UPLOAD_MAX_SIZE:
+            self.error = SIZE_MESSAGE.format(max_size=IMAGE_UPLOAD_MAX_SIZE)
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.error is not None:
+            return None
+        self.received += len(raw_data)
+        if self.received > IMAGE_UPLOAD_MAX_SIZE:
+            self.error = SIZE_MESSAGE.format(max_size=IMAGE_UPLOAD_MAX_SIZE)
+            return None
+        if not self.inspected:
+            self.head += raw_data
+            self._inspect_head()
+            if self.error is not None:
+                return None
+        return raw_data
+
+    def file_complete(self, file_size):
+        if self.error is None:
+            return None
+        return RejectedUploadedFile(
+            self.file_name,
+            self.content_type,
+            self.error,
+        )
+
+    def _inspect_head(self) -> None:
+        try:
+            header = read_image_header(BytesIO(self.head))
+        except ValueError as exc:
+            if len(self.head) >= IMAGE_UPLOAD_HEADER_SIZE:
+                self.inspected = True
+                self.error = str(exc)
+            return
+        self.inspected = True
+        self.head = bytearray()
+        self.error = check_image_header(header)
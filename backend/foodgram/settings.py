@@ -1,15 +1,30 @@
 import os
 from pathlib import Path
 
+from django.core.exceptions import ImproperlyConfigured
 from django.core.management.utils import get_random_secret_key
 from dotenv import load_dotenv
 
-from core.constants import DEFAULT_PAGE_SIZE
+from core.constants import (
+    AUTH_TOKEN_CACHE_SIZE,
+    AUTH_TOKEN_CACHE_TIMEOUT,
+    AUTH_TOKEN_LOCAL_TTL,
+    CACHE_CULL_FREQUENCY,
+    CACHE_MAX_ENTRIES,
+    COUNT_CACHE_TIMEOUT,
+    COUNT_ESTIMATE_THRESHOLD,
+    DEFAULT_PAGE_SIZE,
+    IMAGE_VARIANT_CACHE_SIZE,
+    JOB_WORKER_THREADS,
+    MAX_PAGE_SIZE,
+    RESPONSE_CACHE_TIMEOUT,
+)
 
 BASE_DIR = Path(__file__).resolve().parent.parent
 load_dotenv(BASE_DIR / ".env")
 
 SECRET_KEY = os.getenv("DJANGO_SECRET_KEY", get_random_secret_key())
+SHORT_LINK_SECRET = os.getenv("DJANGO_SHORT_LINK_SECRET", "")
 DEBUG = os.getenv("DJANGO_DEBUG", "false").lower() == "true"
 
 USE_X_FORWARDED_HOST = True
@@ -99,6 +114,48 @@ else:
         }
     }
 
+CACHE_BACKENDS = {
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+    "file": "django.core.cache.backends.filebased.FileBasedCache",
+    "redis": "django.core.cache.backends.redis.RedisCache",
+}
+CACHE_LOCATIONS = {
+    "locmem": "foodgram",
+    "file": BASE_DIR / "cache",
+    "redis": "redis://127.0.0.1:6379/1",
+}
+CACHE_BACKEND = os.getenv("DJANGO_CACHE_BACKEND", "file").lower()
+if CACHE_BACKEND not in CACHE_BACKENDS:
+    raise ImproperlyConfigured(
+        f"Неизвестный DJANGO_CACHE_BACKEND: {CACHE_BACKEND}. "
+        f"Допустимые значения: {', '.join(CACHE_BACKENDS)}."
+    )
+
+CACHES = {
+    "default": {
+        "BACKEND": CACHE_BACKENDS[CACHE_BACKEND],
+        "LOCATION": os.getenv(
+            "DJANGO_CACHE_LOCATION",
+            CACHE_LOCATIONS[CACHE_BACKEND],
+        ),
+        "KEY_PREFIX": os.getenv("DJANGO_CACHE_KEY_PREFIX", "foodgram"),
+    }
+}
+# file и locmem предназначены для локальной разработки: файловый кэш
+# пересчитывает записи при каждом set() и при переполнении удаляет
+# случайную долю ключей, включая версии. На продакшене нужен redis.
+if CACHE_BACKEND != "redis":
+    CACHES["default"]["OPTIONS"] = {
+        "MAX_ENTRIES": int(
+            os.getenv("DJANGO_CACHE_MAX_ENTRIES", CACHE_MAX_ENTRIES)
+        ),
+        "CULL_FREQUENCY": CACHE_CULL_FREQUENCY,
+    }
+
+RESPONSE_CACHE_TIMEOUT = int(
+    os.getenv("DJANGO_RESPONSE_CACHE_TIMEOUT", RESPONSE_CACHE_TIMEOUT)
+)
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -137,6 +194,22 @@ WHITENOISE_USE_FINDERS = DEBUG
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
 
+DEFAULT_AVATAR_SOURCE_DIR = Path(
+    os.getenv(
+        "DJANGO_DEFAULT_AVATAR_SOURCE_DIR",
+        BASE_DIR / "data" / "images" / "test-images",
+    )
+)
+
+IMAGE_VARIANT_ROOT = MEDIA_ROOT / "variants"
+IMAGE_VARIANT_CACHE_SIZE = int(
+    os.getenv("DJANGO_IMAGE_VARIANT_CACHE_SIZE", IMAGE_VARIANT_CACHE_SIZE)
+)
+IMAGE_VARIANT_ACCEL_REDIRECT = (
+    os.getenv("DJANGO_IMAGE_VARIANT_ACCEL_REDIRECT", "false").lower()
+    == "true"
+)
+
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 AUTH_USER_MODEL = "users.User"
 
@@ -145,7 +218,7 @@ REST_FRAMEWORK = {
         "rest_framework.permissions.IsAuthenticatedOrReadOnly",
     ),
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework.authentication.TokenAuthentication",
+        "api.authentication.CachedTokenAuthentication",
     ),
     "DEFAULT_FILTER_BACKENDS": (
         "django_filters.rest_framework.DjangoFilterBackend",
@@ -154,6 +227,33 @@ REST_FRAMEWORK = {
     "PAGE_SIZE": DEFAULT_PAGE_SIZE,
 }
 
+PAGINATION_MAX_PAGE_SIZE = int(
+    os.getenv("DJANGO_PAGINATION_MAX_PAGE_SIZE", MAX_PAGE_SIZE)
+)
+PAGINATION_COUNT_CACHE_TIMEOUT = int(
+    os.getenv("DJANGO_PAGINATION_COUNT_CACHE_TIMEOUT", COUNT_CACHE_TIMEOUT)
+)
+PAGINATION_COUNT_ESTIMATE_THRESHOLD = int(
+    os.getenv(
+        "DJANGO_PAGINATION_COUNT_ESTIMATE_THRESHOLD",
+        COUNT_ESTIMATE_THRESHOLD,
+    )
+)
+
+AUTH_TOKEN_CACHE_SIZE = int(
+    os.getenv("DJANGO_AUTH_TOKEN_CACHE_SIZE", AUTH_TOKEN_CACHE_SIZE)
+)
+AUTH_TOKEN_CACHE_TIMEOUT = int(
+    os.getenv("DJANGO_AUTH_TOKEN_CACHE_TIMEOUT", AUTH_TOKEN_CACHE_TIMEOUT)
+)
+AUTH_TOKEN_LOCAL_TTL = int(
+    os.getenv("DJANGO_AUTH_TOKEN_LOCAL_TTL", AUTH_TOKEN_LOCAL_TTL)
+)
+
+JOB_WORKER_THREADS = int(
+    os.getenv("DJANGO_JOB_WORKER_THREADS", JOB_WORKER_THREADS)
+)
+
 DJOSER = {
     "LOGIN_FIELD": "email",
     "SERIALIZERS": {
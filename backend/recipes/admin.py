@@ -7,6 +7,7 @@ from recipes.models import (
     RecipeIngredient,
     RecipeShortLink,
     ShoppingCart,
+    ShoppingListItem,
 )
 
 
@@ -58,6 +59,14 @@ class ShoppingCartAdmin(admin.ModelAdmin):
     autocomplete_fields = ("user", "recipe")
 
 
+@admin.register(ShoppingListItem)
+class ShoppingListItemAdmin(admin.ModelAdmin):
+
+    list_display = ("user", "ingredient", "total_amount")
+    search_fields = ("user__email", "ingredient__name")
+    autocomplete_fields = ("user", "ingredient")
+
+
 @admin.register(RecipeShortLink)
 class RecipeShortLinkAdmin(admin.ModelAdmin):
 
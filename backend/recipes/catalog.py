@@ -0,0 +1,143 @@
+import gzip
+import hashlib
+import json
+import time
+from bisect import bisect_left
+from datetime import datetime, timezone
+from threading import Lock
+from typing import NamedTuple, Optional
+
+from django.core.cache import cache
+
+from recipes.models import Ingredient
+
+CATALOG_VERSION_CACHE_KEY = "ingredients:catalog-version"
+
+
+def get_catalog_version() -> int:
+    return cache.get_or_set(
+        CATALOG_VERSION_CACHE_KEY,
+        time.time_ns,
+        timeout=None,
+    )
+
+
+def catalog_version_timestamp(version: int) -> datetime:
+    return datetime.fromtimestamp(version / 1e9, tz=timezone.utc)
+
+
+def bump_catalog_version() -> int:
+    version = time.time_ns()
+    cache.set(CATALOG_VERSION_CACHE_KEY, version, timeout=None)
+    return version
+
+
+class CatalogSnapshot(NamedTuple):
+
+    version: int
+    entries: list[dict]
+    by_id: dict[int, dict]
+    names: list[str]
+    folded: list[tuple[str, str, int]]
+    payload: bytes
+    gzipped_payload: bytes
+    etag: str
+
+
+class IngredientCatalog:
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._snapshot: Optional[CatalogSnapshot] = None
+
+    def search(
+        self,
+        prefix: str = "",
+        limit: Optional[int] = None,
+    ) -> list[dict]:
+        snapshot = self.get_snapshot()
+        prefix = (prefix or "").strip()
+        if not prefix:
+            return snapshot.entries[:limit]
+        matches = self._match_case_sensitive(snapshot, prefix)
+        if not matches:
+            matches = self._match_case_insensitive(snapshot, prefix)
+        return [snapshot.entries[position] for position in matches[:limit]]
+
+    def get_snapshot(self) -> CatalogSnapshot:
+        version = get_catalog_version()
+        snapshot = self._snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+        with self._lock:
+            snapshot = self._snapshot
+            if snapshot is None or snapshot.version != version:
+                snapshot = self._build(version)
+                self._snapshot = snapshot
+            return snapshot
+
+    def invalidate(self) -> None:
+        with self._lock:
+            self._snapshot = None
+
+    @staticmethod
+    def _match_case_sensitive(
+        snapshot: CatalogSnapshot,
+        prefix: str,
+    ) -> list[int]:
+        names = snapshot.names
+        position = bisect_left(names, prefix)
+        matches = []
+        while position < len(names) and names[position].startswith(prefix):
+            matches.append(position)
+            position += 1
+        return matches
+
+    @staticmethod
+    def _match_case_insensitive(
+        snapshot: CatalogSnapshot,
+        prefix: str,
+    ) -> list[int]:
+        folded = snapshot.folded
+        prefix = prefix.upper()
+        position = bisect_left(folded, (prefix,))
+        matches = []
+        while (
+            position < len(folded)
+            and folded[position][0].startswith(prefix)
+        ):
+            matches.append(folded[position][2])
+            position += 1
+        return sorted(matches)
+
+    @staticmethod
+    def _build(version: int) -> CatalogSnapshot:
+        rows = sorted(
+            Ingredient.objects.values_list("id", "name", "measurement_unit"),
+            key=lambda row: (row[1], row[2], row[0]),
+        )
+        entries = [
+            {"id": pk, "name": name, "measurement_unit": unit}
+            for pk, name, unit in rows
+        ]
+        payload = json.dumps(
+            entries,
+            ensure_ascii=False,
+            separators=(",", ":"),
+        ).encode("utf-8")
+        return CatalogSnapshot(
+            version=version,
+            entries=entries,
+            by_id={entry["id"]: entry for entry in entries},
+            names=[name for _, name, _ in rows],
+            folded=sorted(
+                (name.upper(), name, position)
+                for position, (_, name, _) in enumerate(rows)
+            ),
+            payload=payload,
+            gzipped_payload=gzip.compress(payload, compresslevel=9, mtime=0),
+            etag='"{}"'.format(hashlib.sha256(payload).hexdigest()[:32]),
+        )
+
+
+ingredient_catalog = IngredientCatalog()
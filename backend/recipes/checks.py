@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.checks import Error, register
+
+
+@register()
+def check_short_link_secret(app_configs, **kwargs):
+    if settings.SHORT_LINK_SECRET:
+        return []
+    return [
+        Error(
+            "Не задан DJANGO_SHORT_LINK_SECRET.",
+            hint=(
+                "Задайте постоянный секрет коротких ссылок: от него зависят "
+                "коды всех рецептов."
+            ),
+            id="recipes.E001",
+        )
+    ]
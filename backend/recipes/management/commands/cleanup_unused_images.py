@@ -1,56 +1,178 @@
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, NamedTuple
 
-from django.conf import settings
-from django.core.management.base import BaseCommand
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
 
-from recipes.models import Recipe
-from users.models import User
+from core.constants import CLEANUP_MIN_AGE, CLEANUP_THREADS, LOAD_BATCH_SIZE
+from core.loaders import chunked
+from core.media import tracked_file_fields
+
+LEGACY_IMAGE_DIRS = ("avatars/",)
+
+
+class StoredFile(NamedTuple):
+
+    name: str
+    size: int
+    modified: float
 
 
 class Command(BaseCommand):
     help = "Удаление неиспользуемых аватаров и изображений рецептов"
 
-    def handle(self, *args, **options):
-        recipe_images = set(
-            Recipe.objects.exclude(image="").values_list("image", flat=True)
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Только показать неиспользуемые файлы, ничего не удаляя.",
         )
-        avatar_images = set(
-            User.objects.exclude(avatar="").values_list("avatar", flat=True)
+        parser.add_argument(
+            "--min-age",
+            dest="min_age",
+            type=int,
+            default=CLEANUP_MIN_AGE,
+            help=(
+                "Не трогать файлы моложе этого возраста, секунд "
+                f"(по умолчанию {CLEANUP_MIN_AGE})"
+            ),
         )
-
-        avatars_dir = os.path.join(
-            settings.MEDIA_ROOT, "data", "images", "avatars"
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=CLEANUP_THREADS,
+            help=(
+                "Количество потоков удаления "
+                f"(по умолчанию {CLEANUP_THREADS})"
+            ),
+        )
+        parser.add_argument(
+            "--batch-size",
+            dest="batch_size",
+            type=int,
+            default=LOAD_BATCH_SIZE,
+            help=(
+                "Количество файлов в одной проверке по базе "
+                f"(по умолчанию {LOAD_BATCH_SIZE})"
+            ),
         )
-        recipes_dir = os.path.join(
-            settings.MEDIA_ROOT, "data", "images", "recipes"
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1 or options["threads"] < 1:
+            raise CommandError(
+                "Размер пачки и число потоков должны быть положительными."
+            )
+        self.dry_run = options["dry_run"]
+        self.verbosity = options["verbosity"]
+        self.shared_prefixes = tuple(
+            prefix
+            for tracked in tracked_file_fields.values()
+            for prefix in tracked.shared_prefixes
         )
+        cutoff = time.time() - options["min_age"]
 
-        if os.path.exists(avatars_dir):
-            for filename in os.listdir(avatars_dir):
-                file_path = os.path.join("data", "images", "avatars", filename)
-                if file_path not in avatar_images:
-                    full_path = os.path.join(settings.MEDIA_ROOT, file_path)
-                    try:
-                        os.remove(full_path)
-                        self.stdout.write(
-                            f"Deleted unused avatar: {file_path}"
-                        )
-                    except OSError as e:
-                        self.stdout.write(f"Error deleting {file_path}: {e}")
-
-        if os.path.exists(recipes_dir):
-            for filename in os.listdir(recipes_dir):
-                file_path = os.path.join("data", "images", "recipes", filename)
-                if file_path not in recipe_images:
-                    full_path = os.path.join(settings.MEDIA_ROOT, file_path)
-                    try:
-                        os.remove(full_path)
-                        self.stdout.write(
-                            f"Deleted unused recipe image: {file_path}"
-                        )
-                    except OSError as e:
-                        self.stdout.write(f"Error deleting {file_path}: {e}")
+        scanned = unused = reclaimed = failed = 0
+        with ThreadPoolExecutor(max_workers=options["threads"]) as executor:
+            for directory in self._image_dirs():
+                candidates = (
+                    stored_file
+                    for stored_file in self._iter_files(directory)
+                    if stored_file.modified < cutoff
+                    and not stored_file.name.startswith(self.shared_prefixes)
+                )
+                for chunk in chunked(candidates, options["batch_size"]):
+                    scanned += len(chunk)
+                    referenced = self._referenced_names(
+                        [stored_file.name for stored_file in chunk]
+                    )
+                    orphans = [
+                        stored_file
+                        for stored_file in chunk
+                        if stored_file.name not in referenced
+                    ]
+                    for stored_file, deleted in zip(
+                        orphans, executor.map(self._delete, orphans)
+                    ):
+                        if deleted:
+                            unused += 1
+                            reclaimed += stored_file.size
+                        else:
+                            failed += 1
 
+        verb = "Будет удалено" if self.dry_run else "Удалено"
         self.stdout.write(
-            self.style.SUCCESS("Successfully cleaned up unused images")
+            self.style.SUCCESS(
+                f"Проверено файлов: {scanned}. {verb} неиспользуемых: "
+                f"{unused}, освобождено {reclaimed} байт "
+                f"({reclaimed / 1024 / 1024:.1f} МБ). Ошибок: {failed}."
+            )
         )
+
+    def _image_dirs(self) -> list[str]:
+        directories = list(LEGACY_IMAGE_DIRS)
+        for model, tracked in tracked_file_fields.items():
+            for field_name in tracked.field_names:
+                upload_to = model._meta.get_field(field_name).upload_to
+                if isinstance(upload_to, str) and upload_to:
+                    directories.append(upload_to.rstrip("/") + "/")
+        return list(dict.fromkeys(directories))
+
+    def _iter_files(self, directory: str) -> Iterator[StoredFile]:
+        try:
+            path = default_storage.path(directory)
+        except NotImplementedError:
+            yield from self._iter_storage_files(directory)
+            return
+        try:
+            entries = os.scandir(path)
+        except FileNotFoundError:
+            return
+        with entries:
+            for entry in entries:
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                stat = entry.stat(follow_symlinks=False)
+                yield StoredFile(
+                    f"{directory}{entry.name}",
+                    stat.st_size,
+                    stat.st_mtime,
+                )
+
+    def _iter_storage_files(self, directory: str) -> Iterator[StoredFile]:
+        if not default_storage.exists(directory):
+            return
+        _, file_names = default_storage.listdir(directory)
+        for file_name in file_names:
+            name = f"{directory}{file_name}"
+            yield StoredFile(
+                name,
+                default_storage.size(name),
+                default_storage.get_modified_time(name).timestamp(),
+            )
+
+    @staticmethod
+    def _referenced_names(names: list[str]) -> set[str]:
+        referenced = set()
+        for model, tracked in tracked_file_fields.items():
+            for field_name in tracked.field_names:
+                referenced.update(
+                    model._base_manager.filter(
+                        **{f"{field_name}__in": names}
+                    ).values_list(field_name, flat=True)
+                )
+        return referenced
+
+    def _delete(self, stored_file: StoredFile) -> bool:
+        if self.dry_run:
+            self.stdout.write(f"Не используется: {stored_file.name}")
+            return True
+        try:
+            default_storage.delete(stored_file.name)
+        except OSError as exc:
+            self.stderr.write(f"Ошибка удаления {stored_file.name}: {exc}")
+            return False
+        if self.verbosity > 1:
+            self.stdout.write(f"Удалён: {stored_file.name}")
+        return True
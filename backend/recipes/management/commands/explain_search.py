@@ -0,0 +1,74 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from recipes.models import Ingredient, Recipe
+
+SEARCH_INDEX_SUFFIXES = (
+    "_name_upper_idx",
+    "_name_trgm_idx",
+    "_name_nocase_idx",
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Показывает планы (EXPLAIN) запросов поиска по началу названия "
+        "и сообщает, используют ли они поисковые индексы."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--prefix",
+            dest="prefix",
+            default="мол",
+            help="Начало названия для проверки (по умолчанию «мол»).",
+        )
+        parser.add_argument(
+            "--analyze",
+            action="store_true",
+            help="Выполнить запросы (EXPLAIN ANALYZE, только PostgreSQL).",
+        )
+
+    def handle(self, *args, **options):
+        prefix = options["prefix"]
+        explain_options = {}
+        if options["analyze"] and connection.vendor == "postgresql":
+            explain_options["analyze"] = True
+
+        queries = (
+            (
+                "Ингредиенты, name__istartswith",
+                Ingredient.objects.filter(name__istartswith=prefix),
+            ),
+            (
+                "Ингредиенты, name__startswith",
+                Ingredient.objects.filter(name__startswith=prefix),
+            ),
+            (
+                "Рецепты, name__istartswith",
+                Recipe.objects.filter(name__istartswith=prefix),
+            ),
+        )
+        all_indexed = True
+        for title, queryset in queries:
+            plan = queryset.order_by("name").explain(**explain_options)
+            indexed = any(suffix in plan for suffix in SEARCH_INDEX_SUFFIXES)
+            all_indexed &= indexed
+            self.stdout.write(self.style.MIGRATE_HEADING(title))
+            self.stdout.write(plan)
+            if indexed:
+                self.stdout.write(self.style.SUCCESS("Индекс используется."))
+            else:
+                self.stdout.write(
+                    self.style.WARNING(
+                        "Индекс не используется (на малых таблицах "
+                        "планировщик может предпочесть полный просмотр)."
+                    )
+                )
+
+        summary = (
+            "Все запросы используют поисковые индексы."
+            if all_indexed
+            else "Не все запросы используют поисковые индексы."
+        )
+        self.stdout.write(summary)
@@ -0,0 +1,73 @@
+import sys
+
+from django.core.management.base import BaseCommand
+
+from recipes.models import Recipe, RecipeShortLink
+from recipes.short_codes import encode_recipe_id
+
+EXPORT_CHUNK_SIZE = 2000
+
+
+class Command(BaseCommand):
+    help = (
+        "Выгружает соответствие коротких ссылок адресам рецептов в виде "
+        "блока map для nginx. Файл подключается в контексте http, после "
+        "чего в location /s/ можно отвечать "
+        "`if ($short_link_target) { return 302 $short_link_target; }`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output",
+            dest="output",
+            help="Файл для записи (по умолчанию стандартный вывод).",
+        )
+        parser.add_argument(
+            "--variable",
+            dest="variable",
+            default="short_link_target",
+            help="Имя переменной nginx (по умолчанию short_link_target).",
+        )
+
+    def handle(self, *args, **options):
+        output = options.get("output")
+        stream = (
+            open(output, "w", encoding="utf-8") if output else sys.stdout
+        )
+        try:
+            written = self._write_map(stream, options["variable"])
+        finally:
+            if output:
+                stream.close()
+        self.stderr.write(
+            self.style.SUCCESS(f"Выгружено коротких ссылок: {written}.")
+        )
+
+    def _write_map(self, stream, variable: str) -> int:
+        stream.write(f"map $uri ${variable} {{\n    default \"\";\n")
+        written = 0
+        for code, recipe_id in self._iter_links():
+            stream.write(f"    /s/{code}/ /recipes/{recipe_id}/;\n")
+            written += 1
+        stream.write("}\n")
+        return written
+
+    @staticmethod
+    def _iter_links():
+        stored = RecipeShortLink.objects.values_list("code", "recipe_id")
+        issued = set()
+        for code, recipe_id in stored.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            issued.add(code)
+            yield code, recipe_id
+        # Вычисляемый код отдаётся только рецептам без сохранённой ссылки
+        # и только если он не занят: так же его разрешает ShortLinkResolver.
+        recipe_ids = Recipe.objects.filter(
+            short_link__isnull=True,
+        ).values_list("pk", flat=True)
+        for recipe_id in recipe_ids.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            try:
+                code = encode_recipe_id(recipe_id)
+            except ValueError:
+                continue
+            if code not in issued:
+                yield code, recipe_id
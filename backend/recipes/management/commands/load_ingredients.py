@@ -1,20 +1,33 @@
 import csv
+import io
+import time
+from collections import Counter
 from pathlib import Path
+from typing import Iterable, Iterator
 
 from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
 
+from core.constants import (
+    LOAD_BATCH_SIZE,
+    MAX_INGREDIENT_NAME_LENGTH,
+    MAX_MEASUREMENT_UNIT_LENGTH,
+)
+from core.loaders import chunked, iter_csv_rows, iter_json_array
+from recipes.catalog import bump_catalog_version
 from recipes.models import Ingredient
 
 
 DATA_DIR = settings.BASE_DIR.parent / "data"
 INGREDIENTS_FILENAME = "ingredients.csv"
 DEFAULT_INGREDIENTS_PATH = DATA_DIR / INGREDIENTS_FILENAME
+STAGING_TABLE = "ingredient_staging"
 
 
 class Command(BaseCommand):
     help = (
-        "Загружает список ингредиентов в базу данных из CSV файла."
+        "Загружает список ингредиентов в базу данных из CSV или JSON файла."
     )
 
     def add_arguments(self, parser):
@@ -22,8 +35,18 @@ class Command(BaseCommand):
             "--path",
             dest="path",
             help=(
-                "Путь к файлу с ингредиентами (по умолчанию "
-                "data/ingredients.csv)"
+                "Путь к файлу с ингредиентами, .csv или .json "
+                "(по умолчанию data/ingredients.csv)"
+            ),
+        )
+        parser.add_argument(
+            "--batch-size",
+            dest="batch_size",
+            type=int,
+            default=LOAD_BATCH_SIZE,
+            help=(
+                "Количество строк в одной пачке вставки "
+                f"(по умолчанию {LOAD_BATCH_SIZE})"
             ),
         )
 
@@ -35,36 +58,113 @@ class Command(BaseCommand):
             file_path = DEFAULT_INGREDIENTS_PATH
         if not file_path.exists():
             raise CommandError(f"Файл {file_path} не найден.")
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("Размер пачки должен быть положительным.")
 
-        created = 0
-        skipped = 0
-        with file_path.open(encoding="utf-8") as csvfile:
-            reader = csv.reader(csvfile)
-            for row in reader:
-                if len(row) < 2:
-                    skipped += 1
-                    continue
-                name, unit = (item.strip() for item in row[:2])
-                if not name or not unit:
-                    skipped += 1
-                    continue
-                _, was_created = Ingredient.objects.get_or_create(
-                    name=name,
-                    measurement_unit=unit,
-                )
-                if was_created:
-                    created += 1
+        self.stats = Counter()
+        started = time.monotonic()
+        rows = self._unique_rows(self._read_rows(file_path))
+        try:
+            with transaction.atomic():
+                if connection.vendor == "postgresql":
+                    created = self._copy_rows(rows, batch_size)
                 else:
-                    skipped += 1
+                    created = self._bulk_create_rows(rows, batch_size)
+                if created:
+                    transaction.on_commit(bump_catalog_version)
+        except (ValueError, csv.Error) as exc:
+            raise CommandError(f"Не удалось прочитать {file_path}: {exc}")
+        elapsed = max(time.monotonic() - started, 1e-6)
 
         self.stdout.write(
             self.style.SUCCESS(
                 (
                     "Загрузка завершена. Новых записей: {created}. "
-                    "Пропущено: {skipped}."
+                    "Пропущено: {skipped}. "
+                    "Обработано {read} строк за {elapsed:.2f} с "
+                    "({rate:.0f} строк/с)."
                 ).format(
                     created=created,
-                    skipped=skipped,
+                    skipped=self.stats["read"] - created,
+                    read=self.stats["read"],
+                    elapsed=elapsed,
+                    rate=self.stats["read"] / elapsed,
                 )
             )
         )
+
+    def _read_rows(self, file_path: Path) -> Iterator[tuple[str, str]]:
+        if file_path.suffix.lower() == ".json":
+            for item in iter_json_array(file_path):
+                if not isinstance(item, dict):
+                    item = {}
+                yield (
+                    str(item.get("name") or ""),
+                    str(item.get("measurement_unit") or ""),
+                )
+        else:
+            for row in iter_csv_rows(file_path):
+                yield tuple(row[:2]) if len(row) >= 2 else ("", "")
+
+    def _unique_rows(
+        self,
+        rows: Iterable[tuple[str, str]],
+    ) -> Iterator[tuple[str, str]]:
+        seen = set()
+        for row in rows:
+            self.stats["read"] += 1
+            name, unit = (item.strip() for item in row)
+            if (
+                not name
+                or not unit
+                or len(name) > MAX_INGREDIENT_NAME_LENGTH
+                or len(unit) > MAX_MEASUREMENT_UNIT_LENGTH
+                or (name, unit) in seen
+            ):
+                continue
+            seen.add((name, unit))
+            yield name, unit
+
+    def _bulk_create_rows(
+        self,
+        rows: Iterable[tuple[str, str]],
+        batch_size: int,
+    ) -> int:
+        before = Ingredient.objects.count()
+        for chunk in chunked(rows, batch_size):
+            Ingredient.objects.bulk_create(
+                [
+                    Ingredient(name=name, measurement_unit=unit)
+                    for name, unit in chunk
+                ],
+                ignore_conflicts=True,
+            )
+        return Ingredient.objects.count() - before
+
+    def _copy_rows(
+        self,
+        rows: Iterable[tuple[str, str]],
+        batch_size: int,
+    ) -> int:
+        table = connection.ops.quote_name(Ingredient._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TEMPORARY TABLE {STAGING_TABLE} "
+                "(name text, measurement_unit text) ON COMMIT DROP"
+            )
+            for chunk in chunked(rows, batch_size):
+                buffer = io.StringIO()
+                csv.writer(buffer).writerows(chunk)
+                buffer.seek(0)
+                cursor.copy_expert(
+                    f"COPY {STAGING_TABLE} (name, measurement_unit) "
+                    "FROM STDIN WITH (FORMAT csv)",
+                    buffer,
+                )
+            cursor.execute(
+                f"INSERT INTO {table} (name, measurement_unit) "
+                f"SELECT name, measurement_unit FROM {STAGING_TABLE} "
+                "ON CONFLICT (name, measurement_unit) DO NOTHING"
+            )
+            return cursor.rowcount
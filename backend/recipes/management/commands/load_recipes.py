@@ -1,70 +1,192 @@
-import json
 import os
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Optional
 
 from django.contrib.auth import get_user_model
-from django.core.files.images import ImageFile
-from django.core.management.base import BaseCommand
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
 
+from core.constants import LOAD_BATCH_SIZE, LOAD_IMAGE_THREADS
+from core.loaders import chunked, iter_json_array
 from recipes.models import Ingredient, Recipe, RecipeIngredient
+from recipes.signals import recipes_bulk_created
 
 
 UserModel = get_user_model()
 
+DEFAULT_RECIPES_PATH = Path("data", "recipes.json")
+
 
 class Command(BaseCommand):
     help = "Импорт кулинарных рецептов из JSON-файла"
 
-    def handle(self, *args, **kwargs):
-        json_file_path = os.path.join("data", "recipes.json")
-
-        with open(json_file_path, "r", encoding="utf-8") as json_data:
-            recipes_collection = json.load(json_data)
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path",
+            dest="path",
+            help=(
+                "Путь к JSON-файлу с рецептами, пути к изображениям "
+                "считаются от его каталога (по умолчанию data/recipes.json)"
+            ),
+        )
+        parser.add_argument(
+            "--incremental",
+            action="store_true",
+            help=(
+                "Не удалять существующие рецепты и пропускать рецепты, "
+                "которые уже есть у автора."
+            ),
+        )
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=LOAD_IMAGE_THREADS,
+            help=(
+                "Количество потоков для копирования изображений "
+                f"(по умолчанию {LOAD_IMAGE_THREADS})"
+            ),
+        )
+
+    def handle(self, *args, **options):
+        json_file_path = Path(options["path"] or DEFAULT_RECIPES_PATH)
+        if not json_file_path.exists():
+            raise CommandError(f"Файл {json_file_path} не найден.")
+        try:
+            recipes_collection = list(iter_json_array(json_file_path))
+        except ValueError as exc:
+            raise CommandError(
+                f"Не удалось прочитать {json_file_path}: {exc}"
+            )
 
-        Recipe.objects.all().delete()
+        authors = self._load_map(
+            UserModel.objects,
+            "username",
+            {entry["author"] for entry in recipes_collection},
+        )
+        ingredients = self._load_map(
+            Ingredient.objects.order_by("pk"),
+            "name",
+            {
+                component["name"]
+                for entry in recipes_collection
+                for component in entry["ingredients"]
+            },
+        )
+        existing = set()
+        if options["incremental"]:
+            existing = set(
+                Recipe.objects.filter(
+                    author_id__in=authors.values()
+                ).values_list("author_id", "name")
+            )
 
+        entries = []
         for recipe_entry in recipes_collection:
-            recipe_author = UserModel.objects.filter(
-                username=recipe_entry["author"]
-            ).first()
-
-            if not recipe_author:
+            author_id = authors.get(recipe_entry["author"])
+            if author_id is None:
                 self.stdout.write(
                     self.style.WARNING(
                         f"Пользователь {recipe_entry['author']} не найден."
                     )
                 )
                 continue
-
-            new_recipe_entry = Recipe.objects.create(
-                name=recipe_entry["name"],
-                text=recipe_entry["text"],
-                cooking_time=recipe_entry["cooking_time"],
-                author=recipe_author,
+            if (author_id, recipe_entry["name"]) in existing:
+                continue
+            existing.add((author_id, recipe_entry["name"]))
+            entries.append((author_id, recipe_entry))
+
+        with ThreadPoolExecutor(max_workers=options["threads"]) as executor:
+            images = list(
+                executor.map(
+                    lambda entry: self._store_image(
+                        json_file_path.parent, entry[1].get("image")
+                    ),
+                    entries,
+                )
             )
 
-            if recipe_entry.get("image"):
-                image_full_path = os.path.join("data", recipe_entry["image"])
-                with open(image_full_path, "rb") as image_file:
-                    new_recipe_entry.image.save(
-                        os.path.basename(image_full_path),
-                        ImageFile(image_file),
-                        save=True,
-                    )
-
-            for ingredient_component in recipe_entry["ingredients"]:
-                ingredient_item = Ingredient.objects.filter(
-                    name=ingredient_component["name"]
-                ).first()
-
-                if ingredient_item:
-                    RecipeIngredient.objects.create(
-                        recipe=new_recipe_entry,
-                        ingredient=ingredient_item,
-                        amount=ingredient_component["amount"],
-                    )
-
-            self.stdout.write(
-                self.style.SUCCESS(
-                    f'Добавлен рецепт: "{new_recipe_entry.name}"'
+        try:
+            with transaction.atomic():
+                if not options["incremental"]:
+                    Recipe.objects.all().delete()
+                recipes = Recipe.objects.bulk_create(
+                    [
+                        Recipe(
+                            name=recipe_entry["name"],
+                            text=recipe_entry["text"],
+                            cooking_time=recipe_entry["cooking_time"],
+                            author_id=author_id,
+                            image=image or "",
+                        )
+                        for (author_id, recipe_entry), image in zip(
+                            entries, images
+                        )
+                    ],
+                    batch_size=LOAD_BATCH_SIZE,
+                )
+                recipe_ingredients = self._build_recipe_ingredients(
+                    recipes, entries, ingredients
+                )
+                for chunk in chunked(recipe_ingredients, LOAD_BATCH_SIZE):
+                    RecipeIngredient.objects.bulk_create(chunk)
+                recipes_bulk_created.send(sender=Recipe, recipes=recipes)
+        except BaseException:
+            for image in images:
+                if image:
+                    default_storage.delete(image)
+            raise
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Добавлено рецептов: {len(recipes)}, "
+                f"ингредиентов в составах: {len(recipe_ingredients)}, "
+                f"изображений: {sum(map(bool, images))}."
+            )
+        )
+
+    @staticmethod
+    def _load_map(queryset, field_name: str, values: set[str]) -> dict:
+        mapping = {}
+        for chunk in chunked(sorted(values), LOAD_BATCH_SIZE):
+            for value, pk in queryset.filter(
+                **{f"{field_name}__in": chunk}
+            ).values_list(field_name, "pk"):
+                mapping.setdefault(value, pk)
+        return mapping
+
+    @staticmethod
+    def _store_image(base_dir: Path, image: Optional[str]) -> Optional[str]:
+        if not image:
+            return None
+        image_path = base_dir / image
+        name = Recipe._meta.get_field("image").generate_filename(
+            None, os.path.basename(image_path)
+        )
+        with image_path.open("rb") as image_file:
+            return default_storage.save(name, File(image_file))
+
+    @staticmethod
+    def _build_recipe_ingredients(
+        recipes: list[Recipe],
+        entries: list[tuple[int, dict]],
+        ingredients: dict[str, int],
+    ) -> list[RecipeIngredient]:
+        recipe_ingredients = []
+        for recipe, (_, recipe_entry) in zip(recipes, entries):
+            amounts = {}
+            for component in recipe_entry["ingredients"]:
+                ingredient_id = ingredients.get(component["name"])
+                if ingredient_id is not None:
+                    amounts.setdefault(ingredient_id, component["amount"])
+            recipe_ingredients.extend(
+                RecipeIngredient(
+                    recipe=recipe,
+                    ingredient_id=ingredient_id,
+                    amount=amount,
                 )
+                for ingredient_id, amount in amounts.items()
             )
+        return recipe_ingredients
@@ -0,0 +1,39 @@
+from django.core.management.base import BaseCommand
+
+from recipes.shopping_list import REBUILD_BATCH_SIZE, rebuild
+
+
+class Command(BaseCommand):
+    help = (
+        "Пересобирает сводные списки покупок из корзин пользователей."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            dest="user_ids",
+            type=int,
+            action="append",
+            help=(
+                "ID пользователя, чей список нужно пересобрать "
+                "(можно указать несколько раз; по умолчанию все)."
+            ),
+        )
+        parser.add_argument(
+            "--batch-size",
+            dest="batch_size",
+            type=int,
+            default=REBUILD_BATCH_SIZE,
+            help="Размер пакета вставки.",
+        )
+
+    def handle(self, *args, **options):
+        created = rebuild(
+            user_ids=options["user_ids"],
+            batch_size=options["batch_size"],
+        )
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Сводные списки пересобраны. Позиций: {created}."
+            )
+        )
@@ -0,0 +1,41 @@
+from django.db import migrations
+
+SEARCH_TABLES = ("recipes_ingredient", "recipes_recipe")
+
+
+def create_search_indexes(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == "postgresql":
+        schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    for table in SEARCH_TABLES:
+        if vendor == "postgresql":
+            schema_editor.execute(
+                f"CREATE INDEX IF NOT EXISTS {table}_name_upper_idx "
+                f"ON {table} (UPPER(name::text) text_pattern_ops)"
+            )
+            schema_editor.execute(
+                f"CREATE INDEX IF NOT EXISTS {table}_name_trgm_idx "
+                f"ON {table} USING gin (UPPER(name::text) gin_trgm_ops)"
+            )
+        elif vendor == "sqlite":
+            schema_editor.execute(
+                f"CREATE INDEX IF NOT EXISTS {table}_name_nocase_idx "
+                f"ON {table} (name COLLATE NOCASE)"
+            )
+
+
+def drop_search_indexes(apps, schema_editor):
+    for table in SEARCH_TABLES:
+        for suffix in ("name_upper_idx", "name_trgm_idx", "name_nocase_idx"):
+            schema_editor.execute(f"DROP INDEX IF EXISTS {table}_{suffix}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("recipes", "0002_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
@@ -0,0 +1,26 @@
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_updated_at(apps, schema_editor):
+    Recipe = apps.get_model("recipes", "Recipe")
+    Recipe.objects.update(updated_at=F("created_at"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("recipes", "0004_shoppinglistitem"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="recipe",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True,
+                verbose_name="Дата изменения",
+            ),
+        ),
+        migrations.RunPython(fill_updated_at, migrations.RunPython.noop),
+    ]
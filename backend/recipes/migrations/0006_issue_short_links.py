@@ -0,0 +1,47 @@
+from django.db import migrations
+
+from core.constants import LOAD_BATCH_SIZE
+from core.loaders import chunked
+from recipes.short_codes import encode_recipe_id, random_code
+
+
+def issue_short_links(apps, schema_editor):
+    Recipe = apps.get_model("recipes", "Recipe")
+    RecipeShortLink = apps.get_model("recipes", "RecipeShortLink")
+    recipe_ids = list(
+        Recipe.objects.filter(short_link__isnull=True)
+        .order_by("pk")
+        .values_list("pk", flat=True)
+    )
+    for chunk in chunked(recipe_ids, LOAD_BATCH_SIZE):
+        codes = {}
+        for recipe_id in chunk:
+            try:
+                codes[recipe_id] = encode_recipe_id(recipe_id)
+            except ValueError:
+                codes[recipe_id] = None
+        taken = set(
+            RecipeShortLink.objects.filter(
+                code__in=codes.values()
+            ).values_list("code", flat=True)
+        )
+        links = []
+        for recipe_id, code in codes.items():
+            while code is None or code in taken:
+                code = random_code()
+                if RecipeShortLink.objects.filter(code=code).exists():
+                    code = None
+            taken.add(code)
+            links.append(RecipeShortLink(recipe_id=recipe_id, code=code))
+        RecipeShortLink.objects.bulk_create(links)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("recipes", "0005_recipe_updated_at"),
+    ]
+
+    operations = [
+        migrations.RunPython(issue_short_links, migrations.RunPython.noop),
+    ]
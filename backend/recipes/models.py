@@ -1,9 +1,10 @@
-import secrets
-import string
+from typing import Iterable
 
 from django.conf import settings
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Exists, F, OuterRef, Value, Window
+from django.db.models.functions import RowNumber
 
 from core.constants import (
     MAX_COOKING_TIME,
@@ -15,6 +16,8 @@ from core.constants import (
     MIN_INGREDIENT_AMOUNT,
     SHORT_CODE_LENGTH,
 )
+from core.media import TrackedFilesMixin
+from recipes.short_codes import encode_recipe_id, random_code
 
 
 class Ingredient(models.Model):
@@ -43,7 +46,39 @@ class Ingredient(models.Model):
         return f"{self.name} ({self.measurement_unit})"
 
 
-class Recipe(models.Model):
+class RecipeQuerySet(models.QuerySet):
+
+    def with_user_flags(self, user) -> "RecipeQuerySet":
+        if user is None or not user.is_authenticated:
+            return self.annotate(
+                is_favorited=Value(False),
+                is_in_shopping_cart=Value(False),
+            )
+        return self.annotate(
+            is_favorited=user_relation_exists(Favorite, user),
+            is_in_shopping_cart=user_relation_exists(ShoppingCart, user),
+        )
+
+    def latest_by_author(self, author_ids, limit=None) -> "RecipeQuerySet":
+        queryset = self.filter(author_id__in=author_ids)
+        if limit is not None:
+            queryset = queryset.annotate(
+                author_position=Window(
+                    RowNumber(),
+                    partition_by=F("author_id"),
+                    order_by=(F("created_at").desc(), F("pk").desc()),
+                ),
+            ).filter(author_position__lte=limit)
+        return queryset.order_by("-created_at", "-pk")
+
+
+def user_relation_exists(model, user) -> Exists:
+    return Exists(
+        model.objects.filter(user=user, recipe=OuterRef("pk"))
+    )
+
+
+class Recipe(TrackedFilesMixin, models.Model):
 
     author = models.ForeignKey(
         settings.AUTH_USER_MODEL,
@@ -88,6 +123,12 @@ class Recipe(models.Model):
         verbose_name="Дата публикации",
         auto_now_add=True,
     )
+    updated_at = models.DateTimeField(
+        verbose_name="Дата изменения",
+        auto_now=True,
+    )
+
+    objects = RecipeQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Рецепт"
@@ -211,6 +252,37 @@ class ShoppingCart(models.Model):
         return f"{self.recipe} в списке покупок у {self.user}"
 
 
+class ShoppingListItem(models.Model):
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        verbose_name="Пользователь",
+    )
+    ingredient = models.ForeignKey(
+        Ingredient,
+        on_delete=models.CASCADE,
+        verbose_name="Ингредиент",
+    )
+    total_amount = models.PositiveBigIntegerField(
+        verbose_name="Общее количество",
+    )
+
+    class Meta:
+        verbose_name = "Позиция сводного списка покупок"
+        verbose_name_plural = "Сводные списки покупок"
+        default_related_name = "shopping_list_items"
+        constraints = (
+            models.UniqueConstraint(
+                fields=("user", "ingredient"),
+                name="unique_shopping_list_item",
+            ),
+        )
+
+    def __str__(self) -> str:
+        return f"{self.ingredient} × {self.total_amount} у {self.user}"
+
+
 class RecipeShortLink(models.Model):
 
     recipe = models.OneToOneField(
@@ -238,11 +310,64 @@ class RecipeShortLink(models.Model):
         return f"{self.code} → {self.recipe}"
 
     @classmethod
-    def generate_unique_code(cls) -> str:
-        alphabet = string.ascii_letters + string.digits
-        while True:
-            code = "".join(
-                secrets.choice(alphabet) for _ in range(SHORT_CODE_LENGTH)
+    def issue(cls, recipe: Recipe) -> "RecipeShortLink":
+        try:
+            with transaction.atomic():
+                return cls.objects.create(
+                    recipe=recipe,
+                    code=encode_recipe_id(recipe.pk),
+                )
+        except (IntegrityError, ValueError):
+            return cls.objects.create(
+                recipe=recipe,
+                code=cls.generate_unique_code(),
+            )
+
+    @classmethod
+    def issue_many(
+        cls,
+        recipes: Iterable[Recipe],
+    ) -> list["RecipeShortLink"]:
+        recipe_ids = [recipe.pk for recipe in recipes]
+        issued = set(
+            cls.objects.filter(recipe_id__in=recipe_ids).values_list(
+                "recipe_id", flat=True
             )
-            if not cls.objects.filter(code=code).exists():
+        )
+        codes = {}
+        for recipe_id in recipe_ids:
+            if recipe_id in issued:
+                continue
+            try:
+                codes[recipe_id] = encode_recipe_id(recipe_id)
+            except ValueError:
+                codes[recipe_id] = None
+        taken = set(
+            cls.objects.filter(code__in=codes.values()).values_list(
+                "code", flat=True
+            )
+        )
+        links = []
+        for recipe_id, code in codes.items():
+            if code is None or code in taken:
+                code = cls.generate_unique_code(exclude=taken)
+            taken.add(code)
+            links.append(cls(recipe_id=recipe_id, code=code))
+        return cls.objects.bulk_create(links)
+
+    @staticmethod
+    def get_code(recipe: Recipe) -> str:
+        try:
+            return recipe.short_link.code
+        except RecipeShortLink.DoesNotExist:
+            return encode_recipe_id(recipe.pk)
+
+    @classmethod
+    def generate_unique_code(cls, exclude: Iterable[str] = ()) -> str:
+        while True:
+            code = random_code()
+            if (
+                code not in exclude
+                and not cls.objects.filter(code=code).exists()
+            ):
                 return code
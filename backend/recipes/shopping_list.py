@@ -0,0 +1,122 @@
+from collections import Counter
+from typing import Iterable, Mapping
+
+from django.db import transaction
+from django.db.models import Sum
+
+from recipes.models import RecipeIngredient, ShoppingCart, ShoppingListItem
+
+REBUILD_BATCH_SIZE = 1000
+
+
+def get_recipe_amounts(recipe_id: int) -> dict[int, int]:
+    return dict(
+        RecipeIngredient.objects.filter(recipe_id=recipe_id).values_list(
+            "ingredient_id",
+            "amount",
+        )
+    )
+
+
+def add_recipe(user_id: int, recipe_id: int) -> None:
+    apply_deltas((user_id,), get_recipe_amounts(recipe_id))
+
+
+def remove_recipe(user_id: int, recipe_id: int) -> None:
+    apply_deltas(
+        (user_id,),
+        {
+            ingredient_id: -amount
+            for ingredient_id, amount in get_recipe_amounts(recipe_id).items()
+        },
+    )
+
+
+def change_recipe(
+    recipe_id: int,
+    old_amounts: Mapping[int, int],
+    new_amounts: Mapping[int, int],
+) -> None:
+    deltas = Counter(new_amounts)
+    deltas.subtract(old_amounts)
+    user_ids = ShoppingCart.objects.filter(recipe_id=recipe_id).values_list(
+        "user_id",
+        flat=True,
+    )
+    apply_deltas(list(user_ids), deltas)
+
+
+def apply_deltas(
+    user_ids: Iterable[int],
+    deltas: Mapping[int, int],
+) -> None:
+    user_ids = list(user_ids)
+    deltas = {
+        ingredient_id: delta
+        for ingredient_id, delta in deltas.items()
+        if delta
+    }
+    if not user_ids or not deltas:
+        return
+    with transaction.atomic():
+        existing = {
+            (item.user_id, item.ingredient_id): item
+            for item in ShoppingListItem.objects.select_for_update().filter(
+                user_id__in=user_ids,
+                ingredient_id__in=deltas,
+            )
+        }
+        to_create, to_update, to_delete = [], [], []
+        for user_id in user_ids:
+            for ingredient_id, delta in deltas.items():
+                item = existing.get((user_id, ingredient_id))
+                if item is None:
+                    if delta > 0:
+                        to_create.append(ShoppingListItem(
+                            user_id=user_id,
+                            ingredient_id=ingredient_id,
+                            total_amount=delta,
+                        ))
+                    continue
+                item.total_amount += delta
+                if item.total_amount > 0:
+                    to_update.append(item)
+                else:
+                    to_delete.append(item.pk)
+        if to_delete:
+            ShoppingListItem.objects.filter(pk__in=to_delete).delete()
+        if to_update:
+            ShoppingListItem.objects.bulk_update(to_update, ("total_amount",))
+        if to_create:
+            ShoppingListItem.objects.bulk_create(to_create)
+
+
+def rebuild(user_ids=None, batch_size: int = REBUILD_BATCH_SIZE) -> int:
+    cart_filter = {"recipe__shopping_carts__isnull": False}
+    stale = ShoppingListItem.objects.all()
+    if user_ids is not None:
+        cart_filter = {"recipe__shopping_carts__user_id__in": user_ids}
+        stale = stale.filter(user_id__in=user_ids)
+    totals = (
+        RecipeIngredient.objects.filter(**cart_filter)
+        .values("recipe__shopping_carts__user_id", "ingredient_id")
+        .annotate(total=Sum("amount"))
+        .order_by()
+    )
+    created = 0
+    with transaction.atomic():
+        stale.delete()
+        batch = []
+        for row in totals.iterator(chunk_size=batch_size):
+            batch.append(ShoppingListItem(
+                user_id=row["recipe__shopping_carts__user_id"],
+                ingredient_id=row["ingredient_id"],
+                total_amount=row["total"],
+            ))
+            if len(batch) >= batch_size:
+                ShoppingListItem.objects.bulk_create(batch)
+                created += len(batch)
+                batch = []
+        ShoppingListItem.objects.bulk_create(batch)
+        created += len(batch)
+    return created
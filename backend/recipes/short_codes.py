@@ -0,0 +1,103 @@
+import hashlib
+import hmac
+import secrets
+import string
+from functools import lru_cache
+from typing import Optional
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from core.constants import SHORT_CODE_CHECK_SPACE, SHORT_CODE_LENGTH
+
+ALPHABET = string.digits + string.ascii_letters
+CODE_SPACE = len(ALPHABET) ** SHORT_CODE_LENGTH
+MAX_RECIPE_ID = CODE_SPACE // SHORT_CODE_CHECK_SPACE - 1
+FEISTEL_ROUNDS = 4
+_HALF_BITS = ((CODE_SPACE - 1).bit_length() + 1) // 2
+_HALF_MASK = (1 << _HALF_BITS) - 1
+_ALPHABET_INDEX = {char: position for position, char in enumerate(ALPHABET)}
+
+
+@lru_cache(maxsize=1)
+def _get_key(secret: str) -> bytes:
+    return hashlib.sha256(f"recipe-short-code:{secret}".encode()).digest()
+
+
+def _key() -> bytes:
+    if not settings.SHORT_LINK_SECRET:
+        raise ImproperlyConfigured(
+            "Не задан DJANGO_SHORT_LINK_SECRET: без постоянного секрета "
+            "короткие ссылки меняются при каждом перезапуске."
+        )
+    return _get_key(settings.SHORT_LINK_SECRET)
+
+
+def _mac(label: str, value: int) -> int:
+    digest = hmac.new(
+        _key(),
+        f"{label}:{value}".encode(),
+        hashlib.sha256,
+    ).digest()
+    return int.from_bytes(digest[:8], "big")
+
+
+def _permute(value: int, inverse: bool = False) -> int:
+    rounds = tuple(range(FEISTEL_ROUNDS))
+    if inverse:
+        rounds = rounds[::-1]
+    while True:
+        left, right = value >> _HALF_BITS, value & _HALF_MASK
+        for round_number in rounds:
+            if inverse:
+                left, right = (
+                    right ^ (_mac(f"r{round_number}", left) & _HALF_MASK),
+                    left,
+                )
+            else:
+                left, right = (
+                    right,
+                    left ^ (_mac(f"r{round_number}", right) & _HALF_MASK),
+                )
+        value = (left << _HALF_BITS) | right
+        if value < CODE_SPACE:
+            return value
+
+
+def _checksum(recipe_id: int) -> int:
+    return _mac("check", recipe_id) % SHORT_CODE_CHECK_SPACE
+
+
+def encode_recipe_id(recipe_id: int) -> str:
+    if not 0 < recipe_id <= MAX_RECIPE_ID:
+        raise ValueError(f"ID рецепта вне допустимого диапазона: {recipe_id}")
+    value = _permute(recipe_id * SHORT_CODE_CHECK_SPACE + _checksum(recipe_id))
+    chars = []
+    for _ in range(SHORT_CODE_LENGTH):
+        value, position = divmod(value, len(ALPHABET))
+        chars.append(ALPHABET[position])
+    return "".join(reversed(chars))
+
+
+def random_code() -> str:
+    return "".join(
+        secrets.choice(ALPHABET) for _ in range(SHORT_CODE_LENGTH)
+    )
+
+
+def decode_recipe_id(code: str) -> Optional[int]:
+    if len(code) != SHORT_CODE_LENGTH:
+        return None
+    value = 0
+    for char in code:
+        position = _ALPHABET_INDEX.get(char)
+        if position is None:
+            return None
+        value = value * len(ALPHABET) + position
+    recipe_id, checksum = divmod(
+        _permute(value, inverse=True),
+        SHORT_CODE_CHECK_SPACE,
+    )
+    if recipe_id and checksum == _checksum(recipe_id):
+        return recipe_id
+    return None
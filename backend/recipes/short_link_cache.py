@@ -0,0 +1,75 @@
+from typing import Optional
+
+from django.core.cache import cache
+
+from core.cache import LocalLRUCache
+from core.constants import (
+    SHORT_LINK_CACHE_SIZE,
+    SHORT_LINK_CACHE_TIMEOUT,
+    SHORT_LINK_LOCAL_TTL,
+    SHORT_LINK_NEGATIVE_CACHE_TIMEOUT,
+)
+from recipes.models import Recipe, RecipeShortLink
+from recipes.short_codes import decode_recipe_id
+
+CACHE_KEY_PREFIX = "short-link:"
+MISSING = 0
+
+
+class ShortLinkResolver:
+
+    def __init__(
+        self,
+        max_size: int = SHORT_LINK_CACHE_SIZE,
+        local_ttl: float = SHORT_LINK_LOCAL_TTL,
+        timeout: int = SHORT_LINK_CACHE_TIMEOUT,
+        negative_timeout: int = SHORT_LINK_NEGATIVE_CACHE_TIMEOUT,
+    ) -> None:
+        self.timeout = timeout
+        self.negative_timeout = negative_timeout
+        self._local = LocalLRUCache(max_size, local_ttl)
+
+    def resolve(self, code: str) -> Optional[int]:
+        recipe_id = self._local.get(code, None)
+        if recipe_id is None:
+            recipe_id = cache.get(self._cache_key(code))
+            if recipe_id is None:
+                recipe_id = self._lookup(code) or MISSING
+                cache.set(
+                    self._cache_key(code),
+                    recipe_id,
+                    self.timeout if recipe_id else self.negative_timeout,
+                )
+            self._local.set(code, recipe_id)
+        return recipe_id or None
+
+    def invalidate(self, *codes: str) -> None:
+        cache.delete_many([self._cache_key(code) for code in codes])
+        self._local.delete(*codes)
+
+    def clear_local(self) -> None:
+        self._local.clear()
+
+    @staticmethod
+    def _lookup(code: str) -> Optional[int]:
+        recipe_id = (
+            RecipeShortLink.objects.filter(code=code)
+            .values_list("recipe_id", flat=True)
+            .first()
+        )
+        if recipe_id is not None:
+            return recipe_id
+        recipe_id = decode_recipe_id(code)
+        if recipe_id is not None and Recipe.objects.filter(
+            pk=recipe_id,
+            short_link__isnull=True,
+        ).exists():
+            return recipe_id
+        return None
+
+    @staticmethod
+    def _cache_key(code: str) -> str:
+        return f"{CACHE_KEY_PREFIX}{code}"
+
+
+short_link_resolver = ShortLinkResolver()
@@ -1,26 +1,152 @@
-import os
+from django.db import transaction
+from django.db.models.signals import (
+    post_delete,
+    post_save,
+    pre_delete,
+    pre_save,
+)
+from django.dispatch import Signal, receiver
+from django.utils import timezone
 
-from django.conf import settings
-from django.db.models.signals import pre_save
-from django.dispatch import receiver
+from core.media import track_file_fields
 
-from .models import Recipe
+from . import shopping_list
+from .catalog import bump_catalog_version
+from .models import (
+    Ingredient,
+    Recipe,
+    RecipeIngredient,
+    RecipeShortLink,
+    ShoppingCart,
+)
+from .short_codes import encode_recipe_id
+from .short_link_cache import short_link_resolver
 
+SHOPPING_LIST_ROW_ATTR = "_shopping_list_row"
 
-@receiver(pre_save, sender=Recipe)
-def delete_old_image(sender, instance, **kwargs):
-    """Удаляет старое изображение рецепта при загрузке нового."""
-    if not instance.pk:
+track_file_fields(Recipe, "image")
+
+recipes_bulk_created = Signal()
+
+
+def deleted_in_bulk(origin) -> bool:
+    """Строка состава удалена запросом или каскадом, а не сама по себе."""
+    # Такие удаления пересчитывает их инициатор: сериализатор рецепта,
+    # удаление корзины или строк списка покупок.
+    return origin is not None and not isinstance(origin, RecipeIngredient)
+
+
+@receiver(post_save, sender=Ingredient)
+@receiver(post_delete, sender=Ingredient)
+def invalidate_ingredient_catalog(sender, **kwargs):
+    """Сбрасывает индекс ингредиентов во всех процессах после записи."""
+    transaction.on_commit(bump_catalog_version)
+
+
+@receiver(post_save, sender=RecipeIngredient)
+@receiver(post_delete, sender=RecipeIngredient)
+def touch_recipe(sender, instance, raw=False, origin=None, **kwargs):
+    """Обновляет дату изменения рецепта при правке его состава."""
+    if not raw and not deleted_in_bulk(origin):
+        Recipe.objects.filter(pk=instance.recipe_id).update(
+            updated_at=timezone.now(),
+        )
+
+
+@receiver(pre_save, sender=RecipeIngredient)
+def remember_recipe_ingredient(sender, instance, raw=False, **kwargs):
+    """Запоминает прежнюю строку состава для пересчёта списков покупок."""
+    row = None
+    if not raw and not instance._state.adding:
+        row = (
+            RecipeIngredient.objects.filter(pk=instance.pk)
+            .values_list("recipe_id", "ingredient_id", "amount")
+            .first()
+        )
+    setattr(instance, SHOPPING_LIST_ROW_ATTR, row)
+
+
+@receiver(post_save, sender=RecipeIngredient)
+def update_shopping_lists(sender, instance, raw=False, **kwargs):
+    """Переносит правку состава рецепта в списки покупок."""
+    if raw:
+        return
+    new_amounts = {instance.ingredient_id: instance.amount}
+    row = getattr(instance, SHOPPING_LIST_ROW_ATTR, None)
+    if row is None:
+        shopping_list.change_recipe(instance.recipe_id, {}, new_amounts)
         return
+    recipe_id, ingredient_id, amount = row
+    if recipe_id == instance.recipe_id:
+        shopping_list.change_recipe(
+            recipe_id, {ingredient_id: amount}, new_amounts
+        )
+        return
+    shopping_list.change_recipe(recipe_id, {ingredient_id: amount}, {})
+    shopping_list.change_recipe(instance.recipe_id, {}, new_amounts)
+
+
+@receiver(post_delete, sender=RecipeIngredient)
+def subtract_from_shopping_lists(sender, instance, origin=None, **kwargs):
+    """Вычитает удалённую строку состава из списков покупок."""
+    if not deleted_in_bulk(origin):
+        shopping_list.change_recipe(
+            instance.recipe_id, {instance.ingredient_id: instance.amount}, {}
+        )
 
+
+@receiver(post_save, sender=ShoppingCart)
+def add_to_shopping_list(sender, instance, created, **kwargs):
+    """Добавляет ингредиенты рецепта в сводный список покупок."""
+    if created:
+        shopping_list.add_recipe(instance.user_id, instance.recipe_id)
+
+
+@receiver(pre_delete, sender=ShoppingCart)
+def remove_from_shopping_list(sender, instance, **kwargs):
+    """Вычитает ингредиенты рецепта из сводного списка покупок."""
+    shopping_list.remove_recipe(instance.user_id, instance.recipe_id)
+
+
+@receiver(post_save, sender=Recipe)
+def issue_short_link(sender, instance, created, raw=False, **kwargs):
+    """Выдаёт короткую ссылку при создании рецепта."""
+    if created and not raw:
+        RecipeShortLink.issue(instance)
+        _invalidate_short_links_on_commit(_derived_code(instance.pk))
+
+
+@receiver(recipes_bulk_created)
+def issue_short_links(sender, recipes, **kwargs):
+    """Выдаёт короткие ссылки рецептам, созданным пачкой."""
+    RecipeShortLink.issue_many(recipes)
+    _invalidate_short_links_on_commit(
+        *(_derived_code(recipe.pk) for recipe in recipes)
+    )
+
+
+@receiver(post_delete, sender=Recipe)
+def forget_recipe_short_link(sender, instance, **kwargs):
+    """Сбрасывает кеш вычисляемого кода удалённого рецепта."""
+    _invalidate_short_links_on_commit(_derived_code(instance.pk))
+
+
+@receiver(post_delete, sender=RecipeShortLink)
+def forget_short_link(sender, instance, **kwargs):
+    """Сбрасывает кеш удалённой короткой ссылки."""
+    _invalidate_short_links_on_commit(instance.code)
+
+
+def _derived_code(recipe_id):
     try:
-        old_instance = Recipe.objects.get(pk=instance.pk)
-        old_image = old_instance.image
-        new_image = instance.image
-
-        if old_image and old_image != new_image:
-            old_image_path = os.path.join(settings.MEDIA_ROOT, str(old_image))
-            if os.path.isfile(old_image_path):
-                os.remove(old_image_path)
-    except Recipe.DoesNotExist:
-        pass
+        return encode_recipe_id(recipe_id)
+    except ValueError:
+        return None
+
+
+def _invalidate_short_links_on_commit(*codes):
+    codes = [code for code in codes if code]
+    if codes:
+        transaction.on_commit(
+            lambda: short_link_resolver.invalidate(*codes)
+        )
@@ -0,0 +1,82 @@
+import os
+import zlib
+from pathlib import Path
+from threading import Lock
+from typing import Optional
+
+from django.conf import settings
+from django.core.files import File
+from django.core.files.storage import Storage, default_storage
+
+from core.constants import (
+    DEFAULT_AVATAR_COUNT,
+    DEFAULT_AVATAR_DIR,
+    DEFAULT_AVATAR_EXTENSIONS,
+)
+
+
+class DefaultAvatars:
+
+    def __init__(
+        self,
+        source_dir: Path,
+        storage: Storage = default_storage,
+        count: int = DEFAULT_AVATAR_COUNT,
+    ) -> None:
+        self.source_dir = Path(source_dir)
+        self.storage = storage
+        self.count = count
+        self._names: Optional[tuple[str, ...]] = None
+        self._lock = Lock()
+
+    def names(self) -> tuple[str, ...]:
+        if self._names is None:
+            with self._lock:
+                if self._names is None:
+                    self._names = self.install()
+        return self._names
+
+    def for_username(self, username: str) -> Optional[str]:
+        names = self.names()
+        if not names:
+            return None
+        return names[zlib.crc32(username.encode()) % len(names)]
+
+    def install(self) -> tuple[str, ...]:
+        names = []
+        for number in range(1, self.count + 1):
+            source = self._find_source(number)
+            if source is None:
+                continue
+            name = f"{DEFAULT_AVATAR_DIR}{source.name}"
+            if not self.storage.exists(name) and not self._link(source, name):
+                with source.open("rb") as file:
+                    name = self.storage.save(name, File(file))
+            names.append(name)
+        return tuple(names)
+
+    def _link(self, source: Path, name: str) -> bool:
+        try:
+            path = Path(self.storage.path(name))
+        except NotImplementedError:
+            return False
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.link(source, path)
+        except FileExistsError:
+            return True
+        except OSError:
+            return False
+        return True
+
+    def _find_source(self, number: int) -> Optional[Path]:
+        for extension in DEFAULT_AVATAR_EXTENSIONS:
+            path = self.source_dir / f"face{number}{extension}"
+            if path.is_file():
+                return path
+        return None
+
+
+default_avatars = DefaultAvatars(
+    source_dir=settings.DEFAULT_AVATAR_SOURCE_DIR,
+)
@@ -1,43 +1,160 @@
-import json
 import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
 
+import django
 from django.contrib.auth import get_user_model
-from django.core.management.base import BaseCommand
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+
+from core.constants import LOAD_BATCH_SIZE
+from core.loaders import chunked, iter_json_array
+from users.avatars import default_avatars
+from users.signals import users_bulk_updated
 
 
 Account = get_user_model()
 
+DEFAULT_USERS_PATH = Path("data", "users.json")
+
 
 class Command(BaseCommand):
     help = "Импорт данных пользователей из JSON-файла"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--path",
+            dest="path",
+            help=(
+                "Путь к JSON-файлу с пользователями "
+                "(по умолчанию data/users.json)"
+            ),
+        )
+        parser.add_argument(
+            "--batch-size",
+            dest="batch_size",
+            type=int,
+            default=LOAD_BATCH_SIZE,
+            help=(
+                "Количество пользователей в одной пачке вставки "
+                f"(по умолчанию {LOAD_BATCH_SIZE})"
+            ),
+        )
+        parser.add_argument(
+            "--processes",
+            type=int,
+            default=os.cpu_count() or 1,
+            help=(
+                "Количество процессов для хеширования паролей "
+                "(по умолчанию по числу ядер)"
+            ),
+        )
+
     def handle(self, *args, **kwargs):
-        users_data_path = os.path.join("data", "users.json")
-
-        with open(users_data_path, "r", encoding="utf-8") as json_file:
-            user_records = json.load(json_file)
-
-        for account_info in user_records:
-            if Account.objects.filter(
-                username=account_info["username"]
-            ).exists():
-                self.stdout.write(
-                    f'Аккаунт с именем "{account_info["username"]}"'
-                    " уже зарегистрирован"
-                )
-                continue
+        users_data_path = Path(kwargs["path"] or DEFAULT_USERS_PATH)
+        if not users_data_path.exists():
+            raise CommandError(f"Файл {users_data_path} не найден.")
+        batch_size = kwargs["batch_size"]
+        if batch_size < 1 or kwargs["processes"] < 1:
+            raise CommandError(
+                "Размер пачки и число процессов должны быть положительными."
+            )
 
-            new_account = Account.objects.create_user(
-                username=account_info["username"],
-                email=account_info["email"],
-                first_name=account_info["first_name"],
-                last_name=account_info["last_name"],
-                password=account_info["password"],
+        self.verbosity = kwargs["verbosity"]
+        created = skipped = 0
+        started = time.monotonic()
+        seen_usernames = set()
+        seen_emails = set()
+        try:
+            with ProcessPoolExecutor(
+                max_workers=kwargs["processes"],
+                initializer=django.setup,
+            ) as executor, transaction.atomic():
+                for user_records in chunked(
+                    iter_json_array(users_data_path), batch_size
+                ):
+                    accounts = self._new_accounts(
+                        user_records, seen_usernames, seen_emails
+                    )
+                    skipped += len(user_records) - len(accounts)
+                    passwords = executor.map(
+                        make_password,
+                        (password for _, password in accounts),
+                        chunksize=max(
+                            1, len(accounts) // kwargs["processes"]
+                        ),
+                    )
+                    new_accounts = []
+                    for (account, _), password in zip(accounts, passwords):
+                        account.password = password
+                        new_accounts.append(account)
+                    Account.objects.bulk_create(new_accounts)
+                    users_bulk_updated.send(
+                        sender=Account,
+                        user_ids=[account.pk for account in new_accounts],
+                    )
+                    created += len(new_accounts)
+        except (KeyError, ValueError) as exc:
+            raise CommandError(
+                f"Не удалось прочитать {users_data_path}: {exc}"
             )
+        elapsed = max(time.monotonic() - started, 1e-6)
 
-            self.stdout.write(
-                self.style.SUCCESS(
-                    f"Добавлен пользователь: {new_account.username} "
-                    f"({new_account.first_name} {new_account.last_name})"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Добавлено пользователей: {created}. "
+                f"Пропущено: {skipped}. "
+                f"Время: {elapsed:.2f} с "
+                f"({(created + skipped) / elapsed:.0f} записей/с)."
+            )
+        )
+
+    def _new_accounts(
+        self,
+        user_records: list[dict],
+        seen_usernames: set[str],
+        seen_emails: set[str],
+    ) -> list[tuple[Account, str]]:
+        records = [
+            (
+                Account.normalize_username(account_info["username"]),
+                Account.objects.normalize_email(account_info["email"]),
+                account_info,
+            )
+            for account_info in user_records
+        ]
+        existing = Account.objects.filter(
+            Q(username__in=[username for username, _, _ in records])
+            | Q(email__in=[email for _, email, _ in records])
+        ).values_list("username", "email")
+        for username, email in existing:
+            seen_usernames.add(username)
+            seen_emails.add(email)
+
+        accounts = []
+        for username, email, account_info in records:
+            if username in seen_usernames or email in seen_emails:
+                if self.verbosity > 1:
+                    self.stdout.write(
+                        f'Аккаунт с именем "{username}"'
+                        " уже зарегистрирован"
+                    )
+                continue
+            seen_usernames.add(username)
+            seen_emails.add(email)
+            accounts.append(
+                (
+                    Account(
+                        username=username,
+                        email=email,
+                        first_name=account_info["first_name"],
+                        last_name=account_info["last_name"],
+                        avatar=default_avatars.for_username(username),
+                    ),
+                    account_info["password"],
                 )
             )
+        return accounts
@@ -1,20 +1,65 @@
-import os
-import shutil
-
-from django.conf import settings
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
 
+from core.constants import DEFAULT_AVATAR_DIR, LOAD_BATCH_SIZE
+from core.loaders import chunked
+from users.avatars import default_avatars
 from users.models import User
+from users.signals import users_bulk_updated
 
 
 class Command(BaseCommand):
     help = "Устанавливает аватары по умолчанию"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--only-missing",
+            action="store_true",
+            help="Установить аватары только пользователям без аватара.",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help=(
+                "Заменить аватар по умолчанию и загруженные пользователями "
+                "аватары. Загруженные файлы не удаляются."
+            ),
+        )
+        parser.add_argument(
+            "--batch-size",
+            dest="batch_size",
+            type=int,
+            default=LOAD_BATCH_SIZE,
+            help=(
+                "Количество пользователей в одной пачке обновления "
+                f"(по умолчанию {LOAD_BATCH_SIZE})"
+            ),
+        )
+
     def handle(self, *args, **options):
-        avatar_dir = os.path.join(settings.MEDIA_ROOT, "avatars")
-        os.makedirs(avatar_dir, exist_ok=True)
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            raise CommandError("Размер пачки должен быть положительным.")
+        if options["only_missing"] and options["force"]:
+            raise CommandError(
+                "Параметры --only-missing и --force несовместимы."
+            )
+        if not default_avatars.names():
+            raise CommandError(
+                "Не найдены файлы аватаров по умолчанию в "
+                f"{default_avatars.source_dir}."
+            )
 
-        users = User.objects.all()
+        users = User.objects.only("pk", "username", "avatar").order_by("pk")
+        missing = Q(avatar="") | Q(avatar__isnull=True)
+        if options["only_missing"]:
+            users = users.filter(missing)
+        elif not options["force"]:
+            users = users.filter(
+                missing | Q(avatar__startswith=DEFAULT_AVATAR_DIR)
+            )
         total_users = users.count()
 
         self.stdout.write(
@@ -22,40 +67,38 @@ class Command(BaseCommand):
             f"{total_users} пользователей..."
         )
 
-        for user in users:
-            avatar_number = user.id % 6 + 1
-
-            for ext in [".png", ".jpg"]:
-                default_avatar_path = os.path.join(
-                    settings.BASE_DIR,
-                    "data",
-                    "images",
-                    "test-images",
-                    f"face{avatar_number}{ext}",
-                )
-
-                if os.path.exists(default_avatar_path):
-                    new_avatar_path = os.path.join(
-                        avatar_dir, f"user_{user.id}_avatar{ext}"
-                    )
-                    shutil.copy2(default_avatar_path, new_avatar_path)
-
-                    user.avatar = f"avatars/user_{user.id}_avatar{ext}"
-                    user.save(update_fields=["avatar"])
-
-                    self.stdout.write(
-                        self.style.SUCCESS(
-                            f"Установлен аватар для пользователя "
-                            f"{user.username}"
-                        )
-                    )
-                    break
-            else:
+        processed = updated = 0
+        with transaction.atomic():
+            for chunk in chunked(
+                users.iterator(chunk_size=batch_size), batch_size
+            ):
+                updated += self._update_chunk(chunk)
+                processed += len(chunk)
                 self.stdout.write(
-                    self.style.WARNING(
-                        f"Не найден файл аватара для пользователя "
-                        f"{user.username}"
-                    )
+                    f"Обработано {processed} из {total_users}, "
+                    f"обновлено {updated}."
                 )
 
-        self.stdout.write(self.style.SUCCESS("Установка аватаров завершена"))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Установка аватаров завершена. Обновлено: {updated}."
+            )
+        )
+
+    def _update_chunk(self, users: list[User]) -> int:
+        now = timezone.now()
+        changed = []
+        for user in users:
+            avatar = default_avatars.for_username(user.username)
+            if user.avatar.name == avatar:
+                continue
+            user.avatar = avatar
+            user.updated_at = now
+            changed.append(user)
+        if changed:
+            User.objects.bulk_update(changed, ("avatar", "updated_at"))
+            users_bulk_updated.send(
+                sender=User,
+                user_ids=[user.pk for user in changed],
+            )
+        return len(changed)
@@ -0,0 +1,26 @@
+from django.db import migrations, models
+from django.db.models import F
+
+
+def fill_updated_at(apps, schema_editor):
+    User = apps.get_model("users", "User")
+    User.objects.update(updated_at=F("date_joined"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="user",
+            name="updated_at",
+            field=models.DateTimeField(
+                auto_now=True,
+                verbose_name="Дата изменения профиля",
+            ),
+        ),
+        migrations.RunPython(fill_updated_at, migrations.RunPython.noop),
+    ]
@@ -10,9 +10,10 @@ from core.constants import (
     MAX_LAST_NAME_LENGTH,
     MAX_USERNAME_LENGTH,
 )
+from core.media import TrackedFilesMixin
 
 
-class User(AbstractUser):
+class User(TrackedFilesMixin, AbstractUser):
 
     username_validator = UnicodeUsernameValidator()
 
@@ -56,6 +57,10 @@ class User(AbstractUser):
         blank=True,
         null=True,
     )
+    updated_at = models.DateTimeField(
+        verbose_name="Дата изменения профиля",
+        auto_now=True,
+    )
 
     USERNAME_FIELD = "email"
     REQUIRED_FIELDS = ["username", "first_name", "last_name"]
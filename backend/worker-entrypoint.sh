@@ -0,0 +1,11 @@
+#!/bin/sh
+set -o errexit
+set -o pipefail
+
+# Миграции применяет контейнер backend; воркер ждёт, пока они не применены.
+until python manage.py migrate --check >/dev/null 2>&1; do
+    echo "Ожидание миграций..."
+    sleep 2
+done
+
+exec "$@"